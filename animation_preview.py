@@ -1,12 +1,32 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog, Canvas, Frame, Label, Scrollbar
-from PIL import Image, ImageTk, ImageDraw
+from PIL import Image, ImageTk
+import csv
 import json
 import os
+import queue
+import threading
 import time
 from typing import List, Tuple, Dict, Optional
+from collections import deque
 from dataclasses import dataclass, field
 
+from atlas_catalog import atlas_entries, load_catalog, update_catalog
+from frame_scheduler import FrameScheduler
+from lru_cache import LRUCache
+
+
+# 预览帧缓存的内存上限（按 宽×高×4 字节估算）
+FRAME_CACHE_BYTES = 256 * 1024 * 1024
+# 各显示缩放下图集位图缓存的内存上限，至少保留当前缩放的一张
+ATLAS_CACHE_BYTES = 512 * 1024 * 1024
+# 预览画布上的基础放大倍数
+BASE_PREVIEW_SCALE = 4
+# 单次播放最多保留的逐帧性能记录数
+PLAYBACK_STATS_LIMIT = 100000
+# 性能信息中渲染耗时取最近多少帧统计
+HUD_WINDOW = 60
+
 
 @dataclass
 class FrameInfo:
@@ -19,19 +39,101 @@ class FrameInfo:
     width: int
     height: int
     selected: bool = False
+    # 精灵名称；图集去重后多个帧共用同一区域，以 index / name 区分，owner 为该区域第一帧的 index
+    name: str = ''
+    owner: int = -1
+    # 图集去重时记录的变换：先逆时针旋转90°，再水平/垂直翻转
+    rotated: bool = False
+    flip_x: bool = False
+    flip_y: bool = False
+
+
+@dataclass
+class FrameStat:
+    """播放时单帧的性能记录"""
+    time_ms: float       # 相对播放开始的显示时刻
+    frame: int           # 图集中的帧下标
+    skipped: int         # 显示本帧前跳过的帧数
+    late_ms: float       # 相对截止时间的延迟
+    render_ms: float     # show_preview_frame 耗时
+    cache_hit: bool      # 是否直接使用了缓存中的缩放帧
+    target_fps: float
+
+
+class PlaybackStats:
+    """本次播放的逐帧记录，超过上限时丢弃最早的记录
+
+    缓存命中数和跳帧数随记录的加入和淘汰累加/扣减，统计始终对应当前保留的这些记录，
+    每帧刷新性能信息时不必遍历全部记录。
+    """
+    
+    def __init__(self, limit: int = PLAYBACK_STATS_LIMIT):
+        self.records = deque(maxlen=limit)
+        self.cache_hits = 0
+        self.skipped = 0
+    
+    def __len__(self):
+        return len(self.records)
+    
+    def __iter__(self):
+        return iter(self.records)
+    
+    def __getitem__(self, index) -> FrameStat:
+        return self.records[index]
+    
+    def append(self, stat: FrameStat):
+        if len(self.records) == self.records.maxlen:
+            evicted = self.records[0]
+            self.cache_hits -= evicted.cache_hit
+            self.skipped -= evicted.skipped
+        self.records.append(stat)
+        self.cache_hits += stat.cache_hit
+        self.skipped += stat.skipped
+    
+    def clear(self):
+        self.records.clear()
+        self.cache_hits = 0
+        self.skipped = 0
+    
+    @property
+    def hit_rate(self) -> float:
+        return self.cache_hits / len(self.records) if self.records else 0.0
 
 
 @dataclass
 class ActionGroup:
     """动作组"""
     name: str
-    frames: List[Tuple[int, int]] = field(default_factory=list)  # [(row, col), ...]
+    frames: List[int] = field(default_factory=list)  # 帧的 index（即 metadata 中 sprites 的下标）
     
     @property
     def frame_count(self):
         return len(self.frames)
 
 
+def render_frame(atlas: Image.Image, frame: FrameInfo, scale: float) -> Optional[Image.Image]:
+    """从图集裁出一帧，还原去重变换并按 scale 最近邻放大，尺寸为0时返回 None"""
+    sprite = atlas.crop((frame.x, frame.y, frame.x + frame.width, frame.y + frame.height))
+
+    # 还原去重时合并的镜像/旋转帧
+    if frame.rotated:
+        sprite = sprite.transpose(Image.Transpose.ROTATE_90)
+    if frame.flip_x:
+        sprite = sprite.transpose(Image.Transpose.FLIP_LEFT_RIGHT)
+    if frame.flip_y:
+        sprite = sprite.transpose(Image.Transpose.FLIP_TOP_BOTTOM)
+
+    width = int(sprite.width * scale)
+    height = int(sprite.height * scale)
+    if width <= 0 or height <= 0:
+        return None
+    return sprite.resize((width, height), Image.NEAREST)
+
+
+def photo_bytes(photo) -> int:
+    return photo.width() * photo.height() * 4
+
+
 class AnimationPreviewApp:
     def __init__(self, root):
         self.root = root
@@ -41,9 +143,20 @@ class AnimationPreviewApp:
         # 数据成员
         self.atlas_image = None
         self.atlas_photo = None
+        self.atlas_photo_cache = LRUCache(ATLAS_CACHE_BYTES, sizeof=photo_bytes)  # 显示缩放 -> PhotoImage
+        self.atlas_display_scale = None  # 画布上当前位图和帧边框对应的缩放
+        self.frame_items = []            # 与 self.frames 一一对应的 (边框, 序号) 画布对象
         self.metadata = None
         self.current_atlas_path = None
+        
+        # 图集目录：output 下各导出文件夹的摘要，启动时先用已保存的目录填充列表
+        self.catalog: Dict[str, Dict] = {}
+        self.catalog_job = 0
+        self.catalog_results = queue.Queue()
+        self.catalog_thumbnails = {}  # 文件夹名 -> 缩略图 PhotoImage
+        self.atlas_filter_var = tk.StringVar()
         self.frames: List[FrameInfo] = []
+        self.frame_stacks: Dict[int, List[int]] = {}  # 区域第一帧的 index -> 共用该区域的所有帧
         self.selected_frames: List[FrameInfo] = []
         self.action_groups: Dict[str, ActionGroup] = {}
         
@@ -51,7 +164,12 @@ class AnimationPreviewApp:
         self.is_playing = False
         self.current_frame_index = 0
         self.frame_rate = 12
-        self.last_frame_time = 0
+        self.scheduler = FrameScheduler(self.frame_rate)
+        self.animate_after = None  # 下一帧定时器的 after id
+        self.playback_stats = PlaybackStats()  # 本次播放的逐帧记录
+        self.playback_start = 0.0
+        self.last_frame_cache_hit = False
+        self.show_hud = tk.BooleanVar(value=False)
         
         # 参考图集相关
         self.reference_atlas = None
@@ -63,12 +181,24 @@ class AnimationPreviewApp:
         # 缩放相关
         self.animation_scale = 1.0  # 动画精灵缩放比例
         
+        # 预览帧缓存：(帧下标, 缩放) -> PhotoImage，后台线程预先生成缩放后的帧
+        self.frame_cache = LRUCache(FRAME_CACHE_BYTES, sizeof=photo_bytes)
+        self.frame_cache_generation = 0  # 缩放或图集变化时递增，丢弃过期的生成结果
+        self.frame_warm_keys = set()     # 已排队、尚未放入缓存的键
+        self.frame_requests = queue.Queue()
+        self.frame_results = queue.Queue()
+        self.frame_polling = False
+        self.reference_photo = None
+        
         # UI元素
         self.scale_factor = 2.0  # 放大倍数
         
         self.setup_ui()
         self.load_atlas_list()
         
+        worker = threading.Thread(target=self.run_frame_worker, daemon=True)
+        worker.start()
+        
     def setup_ui(self):
         """设置UI界面"""
         # 创建菜单栏
@@ -109,6 +239,14 @@ class AnimationPreviewApp:
         """设置左侧面板"""
         tk.Label(parent, text="图集列表", font=("Arial", 12, "bold")).pack(pady=10)
         
+        # 筛选框
+        filter_frame = tk.Frame(parent)
+        filter_frame.pack(fill=tk.X)
+        
+        tk.Label(filter_frame, text="筛选:").pack(side=tk.LEFT)
+        tk.Entry(filter_frame, textvariable=self.atlas_filter_var).pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.atlas_filter_var.trace_add('write', lambda *args: self.refresh_atlas_listbox())
+        
         # 图集列表框
         list_frame = tk.Frame(parent)
         list_frame.pack(fill=tk.BOTH, expand=True, pady=5)
@@ -121,6 +259,12 @@ class AnimationPreviewApp:
         scrollbar.config(command=self.atlas_listbox.yview)
         
         self.atlas_listbox.bind('<<ListboxSelect>>', self.on_atlas_select)
+        self.atlas_listbox.bind('<Motion>', self.on_atlas_hover)
+        
+        # 鼠标所指图集的缩略图和摘要
+        self.atlas_thumb_label = tk.Label(parent, compound=tk.LEFT, justify=tk.LEFT, anchor=tk.W,
+                                          fg='gray', font=("Arial", 9))
+        self.atlas_thumb_label.pack(fill=tk.X, pady=2)
         
         # 刷新按钮
         tk.Button(parent, text="刷新列表", command=self.load_atlas_list).pack(pady=5)
@@ -196,7 +340,11 @@ class AnimationPreviewApp:
         self.atlas_canvas.bind("<Control-Button-1>", self.on_canvas_ctrl_click)
         
         # 操作提示
-        tip_label = tk.Label(parent, text="点击选择帧 | Ctrl+点击多选 | 拖拽连续选择", 
+        # 当前选中的帧
+        self.selection_label = tk.Label(parent, text="未选择帧", fg='blue', font=("Arial", 9))
+        self.selection_label.pack()
+        
+        tip_label = tk.Label(parent, text="点击选择帧（重叠的重复帧再次点击切换）| Ctrl+点击多选 | 拖拽连续选择", 
                            fg='gray', font=("Arial", 9))
         tip_label.pack()
         
@@ -252,6 +400,14 @@ class AnimationPreviewApp:
         
         tk.Button(control_frame, text="⟲ 重置", command=self.reset_animation).pack(side=tk.LEFT, padx=2)
         
+        # 性能信息
+        hud_frame = tk.Frame(scrollable_frame)
+        hud_frame.pack(fill=tk.X, pady=2)
+        
+        tk.Checkbutton(hud_frame, text="显示性能信息", variable=self.show_hud,
+                      command=self.draw_hud).pack(side=tk.LEFT)
+        tk.Button(hud_frame, text="导出CSV", command=self.export_playback_stats).pack(side=tk.LEFT, padx=5)
+        
         # 帧率控制
         fps_frame = tk.Frame(scrollable_frame)
         fps_frame.pack(fill=tk.X, pady=5)
@@ -334,27 +490,56 @@ class AnimationPreviewApp:
                  bg='#4CAF50', fg='white', padx=20, pady=5).pack(pady=10)
         
     def load_atlas_list(self):
-        """加载图集列表"""
-        self.atlas_listbox.delete(0, tk.END)
-        
+        """加载图集列表：先用已保存的目录立即填充，再在后台只解析新增或变化的导出文件夹"""
         output_dir = os.path.join(os.path.dirname(__file__), 'output')
-        if not os.path.exists(output_dir):
+        self.catalog = load_catalog(output_dir)
+        self.refresh_atlas_listbox()
+        
+        self.catalog_job += 1
+        job = self.catalog_job
+        entries = dict(self.catalog)
+        
+        def run():
+            self.catalog_results.put((job, update_catalog(output_dir, entries)))
+        
+        threading.Thread(target=run, daemon=True).start()
+        self.root.after(50, self.poll_catalog)
+    
+    def poll_catalog(self):
+        try:
+            job, entries = self.catalog_results.get_nowait()
+        except queue.Empty:
+            self.root.after(50, self.poll_catalog)
+            return
+        if job != self.catalog_job:
+            return
+        if entries != self.catalog:
+            self.catalog = entries
+            self.catalog_thumbnails = {}
+            self.refresh_atlas_listbox()
+    
+    def refresh_atlas_listbox(self):
+        """按筛选框内容重新填充图集列表"""
+        self.atlas_listbox.delete(0, tk.END)
+        for entry in atlas_entries(self.catalog, self.atlas_filter_var.get()):
+            self.atlas_listbox.insert(tk.END, entry['name'])
+    
+    def on_atlas_hover(self, event):
+        """显示鼠标所指图集的缩略图、尺寸和精灵数"""
+        if not self.atlas_listbox.size():
+            return
+        name = self.atlas_listbox.get(self.atlas_listbox.nearest(event.y))
+        entry = self.catalog.get(name)
+        if not entry:
             return
         
-        # 扫描output目录
-        for folder in os.listdir(output_dir):
-            folder_path = os.path.join(output_dir, folder)
-            if os.path.isdir(folder_path):
-                metadata_path = os.path.join(folder_path, 'metadata.json')
-                if os.path.exists(metadata_path):
-                    # 读取metadata确认是图集
-                    try:
-                        with open(metadata_path, 'r', encoding='utf-8') as f:
-                            data = json.load(f)
-                            if data.get('export_mode') == 'atlas':
-                                self.atlas_listbox.insert(tk.END, folder)
-                    except:
-                        pass
+        if name not in self.catalog_thumbnails and entry.get('thumbnail'):
+            self.catalog_thumbnails[name] = tk.PhotoImage(data=entry['thumbnail'])
+        width, height = entry.get('atlas_size', [0, 0])
+        self.atlas_thumb_label.config(
+            image=self.catalog_thumbnails.get(name, ''),
+            text=f" {entry.get('atlas_name', name)}\n {width}×{height} | {entry.get('sprite_count', 0)}个精灵"
+        )
     
     def on_atlas_select(self, event):
         """选择图集"""
@@ -381,6 +566,11 @@ class AnimationPreviewApp:
         self.current_atlas_path = folder_path
         
         self.atlas_image = Image.open(atlas_path)
+        # 先解码，后台线程裁切时不再触发延迟加载
+        self.atlas_image.load()
+        self.invalidate_frame_cache()
+        self.atlas_photo_cache.clear()
+        self.reset_playback_stats()
         self.parse_frames()
         self.display_atlas()
         
@@ -404,7 +594,9 @@ class AnimationPreviewApp:
         sprites = self.metadata['sprites']
         padding = self.metadata.get('sprite_padding', 0)
         
-        # 计算行列信息
+        # 计算行列信息，并把共用同一图集区域的帧归为一组
+        self.frame_stacks = {}
+        owners = {}
         for i, sprite in enumerate(sprites):
             frame = sprite['frame']
             
@@ -423,50 +615,123 @@ class AnimationPreviewApp:
                 x=frame['x'],
                 y=frame['y'],
                 width=frame['width'],
-                height=frame['height']
+                height=frame['height'],
+                name=sprite.get('name', f'sprite_{i}'),
+                owner=owners.setdefault((frame['x'], frame['y'], frame['width'], frame['height']), i),
+                rotated=sprite.get('rotated', False),
+                flip_x=sprite.get('flipX', False),
+                flip_y=sprite.get('flipY', False)
             )
             self.frames.append(frame_info)
+            self.frame_stacks.setdefault(frame_info.owner, []).append(i)
     
     def display_atlas(self):
-        """显示图集"""
+        """显示图集：缩放后的位图按缩放比例缓存，帧边框、序号和选中框为画布对象"""
         if not self.atlas_image:
             return
         
-        # 创建带网格的图集副本
-        display_img = self.atlas_image.copy()
-        draw = ImageDraw.Draw(display_img)
-        
-        # 绘制网格和选中框
-        for frame in self.frames:
-            color = 'red' if frame.selected else 'yellow'
-            width = 2 if frame.selected else 1
-            
-            # 绘制边框
-            draw.rectangle(
-                [frame.x, frame.y, frame.x + frame.width - 1, frame.y + frame.height - 1],
-                outline=color, width=width
-            )
-            
-            # 绘制索引号
-            draw.text((frame.x + 2, frame.y + 2), str(frame.index), fill='white')
-        
-        # 缩放显示
         scale = self.scale_factor
-        display_width = int(display_img.width * scale)
-        display_height = int(display_img.height * scale)
-        display_img = display_img.resize((display_width, display_height), Image.NEAREST)
+        self.atlas_photo = self.scaled_atlas_photo(scale)
+        self.atlas_display_scale = scale
         
         # 更新画布
-        self.atlas_photo = ImageTk.PhotoImage(display_img)
         self.atlas_canvas.delete("all")
-        self.atlas_canvas.create_image(0, 0, anchor=tk.NW, image=self.atlas_photo)
-        self.atlas_canvas.config(scrollregion=self.atlas_canvas.bbox("all"))
+        self.atlas_canvas.create_image(0, 0, anchor=tk.NW, image=self.atlas_photo, tags="atlas")
+        
+        # 绘制网格和选中框：共用同一区域的帧只画一个边框，序号标出组内帧数
+        self.frame_items = []
+        for frame in self.frames:
+            if frame.owner != frame.index:
+                self.frame_items.append(self.frame_items[frame.owner])
+                continue
+            stack = self.frame_stacks[frame.index]
+            x1 = frame.x * scale
+            y1 = frame.y * scale
+            rect = self.atlas_canvas.create_rectangle(
+                x1, y1, (frame.x + frame.width) * scale, (frame.y + frame.height) * scale,
+                tags=("frame_border", "overlay"), **self.frame_outline(self.stack_selected(frame))
+            )
+            label = str(frame.index) if len(stack) == 1 else f"{frame.index} (+{len(stack) - 1})"
+            text = self.atlas_canvas.create_text(
+                x1 + 2, y1 + 2, anchor=tk.NW, text=label, fill='white',
+                font=("Arial", 8), tags=("frame_label", "overlay")
+            )
+            self.frame_items.append((rect, text))
+        
+        self.atlas_canvas.config(scrollregion=(0, 0, self.atlas_photo.width(), self.atlas_photo.height()))
+        self.update_selection_label()
+    
+    def scaled_atlas_photo(self, scale):
+        photo = self.atlas_photo_cache.get(scale)
+        if photo is None:
+            display_width = int(self.atlas_image.width * scale)
+            display_height = int(self.atlas_image.height * scale)
+            photo = ImageTk.PhotoImage(
+                self.atlas_image.resize((display_width, display_height), Image.NEAREST)
+            )
+            self.atlas_photo_cache.put(scale, photo)
+        return photo
+    
+    @staticmethod
+    def frame_outline(selected: bool) -> Dict:
+        if selected:
+            return {'outline': 'red', 'width': 2}
+        return {'outline': 'yellow', 'width': 1}
+    
+    def stack_selected(self, frame: FrameInfo) -> bool:
+        """与该帧共用同一区域的帧中是否有被选中的"""
+        return any(self.frames[i].selected for i in self.frame_stacks[frame.owner])
+    
+    def frames_at(self, x: float, y: float) -> List[FrameInfo]:
+        """包含图集坐标 (x, y) 的所有帧，按 index 排序；去重后的别名帧与原帧一同返回"""
+        return [frame for frame in self.frames
+                if frame.x <= x < frame.x + frame.width and frame.y <= y < frame.y + frame.height]
+    
+    @staticmethod
+    def frame_label(frame: FrameInfo) -> str:
+        """帧名称，带去重变换的帧附上变换标记"""
+        marks = [mark for flag, mark in ((frame.rotated, "旋转"), (frame.flip_x, "水平翻转"),
+                                         (frame.flip_y, "垂直翻转")) if flag]
+        return f"{frame.name}({'+'.join(marks)})" if marks else frame.name
+    
+    def update_selection_label(self):
+        names = [self.frame_label(frame) for frame in self.selected_frames]
+        if not names:
+            self.selection_label.config(text="未选择帧")
+            return
+        shown = ", ".join(names[:5]) + (f" 等{len(names)}帧" if len(names) > 5 else "")
+        self.selection_label.config(text=f"已选 {len(names)} 帧: {shown}")
+    
+    def refresh_frame_overlays(self, frames=None):
+        """选择变化后只更新受影响帧的边框样式，frames 为 None 时更新全部"""
+        if len(self.frame_items) != len(self.frames):
+            self.display_atlas()
+            return
+        for frame in (self.frames if frames is None else frames):
+            rect, _ = self.frame_items[frame.index]
+            selected = self.stack_selected(frame)
+            self.atlas_canvas.itemconfig(rect, **self.frame_outline(selected))
+            # 选中框画在相邻帧的边框之上，序号始终在最上层
+            if selected:
+                self.atlas_canvas.tag_raise(rect)
+        self.atlas_canvas.tag_raise("frame_label")
+        self.update_selection_label()
     
     def on_scale_change(self, value):
-        """缩放变化"""
+        """缩放变化：换用该缩放下缓存的位图，边框和序号按比例移动"""
         self.scale_factor = float(value)
-        if self.atlas_image:
+        if not self.atlas_image:
+            return
+        if not self.frame_items or self.atlas_display_scale is None:
             self.display_atlas()
+            return
+        
+        ratio = self.scale_factor / self.atlas_display_scale
+        self.atlas_photo = self.scaled_atlas_photo(self.scale_factor)
+        self.atlas_display_scale = self.scale_factor
+        self.atlas_canvas.itemconfig("atlas", image=self.atlas_photo)
+        self.atlas_canvas.scale("overlay", 0, 0, ratio, ratio)
+        self.atlas_canvas.config(scrollregion=(0, 0, self.atlas_photo.width(), self.atlas_photo.height()))
     
     def on_canvas_click(self, event):
         """画布点击"""
@@ -480,17 +745,16 @@ class AnimationPreviewApp:
         real_x = canvas_x / self.scale_factor
         real_y = canvas_y / self.scale_factor
         
-        # 查找点击的帧
-        clicked_frame = None
-        for frame in self.frames:
-            if (frame.x <= real_x <= frame.x + frame.width and
-                frame.y <= real_y <= frame.y + frame.height):
-                clicked_frame = frame
-                break
-        
-        if clicked_frame:
+        # 查找点击的帧；多个帧共用同一区域时，重复点击依次选中其中每一帧
+        stack = self.frames_at(real_x, real_y)
+        if stack:
+            clicked_frame = stack[0]
+            if len(self.selected_frames) == 1 and self.selected_frames[0] in stack:
+                clicked_frame = stack[(stack.index(self.selected_frames[0]) + 1) % len(stack)]
+            
             # 清除之前的选择
-            for frame in self.frames:
+            changed = self.selected_frames + [clicked_frame]
+            for frame in self.selected_frames:
                 frame.selected = False
             self.selected_frames = []
             
@@ -498,7 +762,7 @@ class AnimationPreviewApp:
             clicked_frame.selected = True
             self.selected_frames = [clicked_frame]
             
-            self.display_atlas()
+            self.refresh_frame_overlays(changed)
     
     def on_canvas_ctrl_click(self, event):
         """Ctrl+点击多选"""
@@ -512,19 +776,20 @@ class AnimationPreviewApp:
         real_x = canvas_x / self.scale_factor
         real_y = canvas_y / self.scale_factor
         
-        # 查找点击的帧
-        for frame in self.frames:
-            if (frame.x <= real_x <= frame.x + frame.width and
-                frame.y <= real_y <= frame.y + frame.height):
-                # 切换选择状态
-                frame.selected = not frame.selected
-                if frame.selected and frame not in self.selected_frames:
-                    self.selected_frames.append(frame)
-                elif not frame.selected and frame in self.selected_frames:
-                    self.selected_frames.remove(frame)
-                break
-        
-        self.display_atlas()
+        # 查找点击的帧；多个帧共用同一区域时，依次加入组内未选中的帧，全部选中后再逐个取消最后加入的
+        stack = self.frames_at(real_x, real_y)
+        if not stack:
+            return
+        unselected = [frame for frame in stack if not frame.selected]
+        if unselected:
+            frame = unselected[0]
+            frame.selected = True
+            self.selected_frames.append(frame)
+        else:
+            frame = max(stack, key=self.selected_frames.index)
+            frame.selected = False
+            self.selected_frames.remove(frame)
+        self.refresh_frame_overlays([frame])
     
     def on_canvas_drag(self, event):
         """拖拽选择"""
@@ -539,38 +804,66 @@ class AnimationPreviewApp:
         
         self.is_playing = not self.is_playing
         
+        self.stop_animation_timer()
         if self.is_playing:
             self.play_button.config(text="⏸ 暂停")
             self.current_frame_index = 0
+            self.warm_frame_cache()
+            self.reset_playback_stats()
             self.animate()
         else:
             self.play_button.config(text="▶ 播放")
     
+    def reset_playback_stats(self):
+        """清空性能记录；正在播放时从当前时刻重新计时，之后的统计只对应新的帧序列"""
+        self.playback_stats.clear()
+        if self.is_playing:
+            self.scheduler.start()
+            self.playback_start = self.scheduler.deadline
+        self.draw_hud()
+    
+    def stop_animation_timer(self):
+        if self.animate_after is not None:
+            self.root.after_cancel(self.animate_after)
+            self.animate_after = None
+        self.scheduler.stop()
+    
     def animate(self):
-        """动画循环"""
+        """动画循环：在每帧的截止时间触发，来迟时跳过错过的帧"""
+        self.animate_after = None
         if not self.is_playing or not self.selected_frames:
             return
         
-        # 计算帧间隔
-        frame_interval = 1000 / self.frame_rate  # 毫秒
+        frame_count = len(self.selected_frames)
+        skipped = self.scheduler.tick()
+        self.current_frame_index = (self.current_frame_index + skipped) % frame_count
+        
+        # 显示当前帧并记录耗时
+        render_start = time.perf_counter()
+        self.show_preview_frame(self.current_frame_index)
+        render_ms = (time.perf_counter() - render_start) * 1000
+        
+        presented_at, late = self.scheduler.presented[-1]
+        self.playback_stats.append(FrameStat(
+            time_ms=(presented_at - self.playback_start) * 1000,
+            frame=self.selected_frames[self.current_frame_index].index,
+            skipped=skipped,
+            late_ms=late * 1000,
+            render_ms=render_ms,
+            cache_hit=self.last_frame_cache_hit,
+            target_fps=self.scheduler.fps
+        ))
+        self.draw_hud()
         
-        current_time = time.time() * 1000
-        if current_time - self.last_frame_time >= frame_interval:
-            # 显示当前帧
-            self.show_preview_frame(self.current_frame_index)
-            
-            # 更新帧索引
-            self.current_frame_index = (self.current_frame_index + 1) % len(self.selected_frames)
-            self.last_frame_time = current_time
-            
-            # 更新信息
-            self.frame_info_label.config(
-                text=f"帧: {self.current_frame_index + 1}/{len(self.selected_frames)}"
-            )
+        # 更新信息
+        self.frame_info_label.config(
+            text=f"帧: {self.current_frame_index + 1}/{frame_count} | "
+            f"实际 {self.scheduler.achieved_fps:.1f} FPS | 抖动 {self.scheduler.jitter_ms:.1f}ms"
+        )
         
-        # 继续动画循环
-        if self.is_playing:
-            self.root.after(10, self.animate)
+        # 更新帧索引，等到下一帧的截止时间再继续
+        self.current_frame_index = (self.current_frame_index + 1) % frame_count
+        self.animate_after = self.root.after(self.scheduler.delay_ms(), self.animate)
     
     def show_preview_frame(self, index):
         """显示预览帧（支持分层显示）"""
@@ -584,62 +877,146 @@ class AnimationPreviewApp:
         canvas_width = self.preview_canvas.winfo_width()
         canvas_height = self.preview_canvas.winfo_height()
         
-        # 基础放大倍数
-        base_preview_scale = 4
-        
-        # 1. 显示参考精灵（如果有）
+        # 1. 显示参考精灵（如果有），参考精灵使用固定的放大倍数，只在切换参考精灵时缩放一次
         if self.show_reference.get() and self.selected_reference_sprite:
-            ref_sprite = self.selected_reference_sprite
-            
-            # 参考精灵使用固定的放大倍数
-            ref_width = ref_sprite.width * base_preview_scale
-            ref_height = ref_sprite.height * base_preview_scale
-            ref_sprite_scaled = ref_sprite.resize((ref_width, ref_height), Image.NEAREST)
-            
-            # 半透明处理（可选）
-            ref_sprite_scaled = ref_sprite_scaled.convert('RGBA')
-            # ref_sprite_scaled.putalpha(128)  # 半透明
-            
-            self.reference_photo = ImageTk.PhotoImage(ref_sprite_scaled)
+            if self.reference_photo is None:
+                ref_sprite = self.selected_reference_sprite
+                ref_sprite_scaled = ref_sprite.resize(
+                    (ref_sprite.width * BASE_PREVIEW_SCALE, ref_sprite.height * BASE_PREVIEW_SCALE),
+                    Image.NEAREST
+                ).convert('RGBA')
+                self.reference_photo = ImageTk.PhotoImage(ref_sprite_scaled)
             
             # 居中显示参考精灵
-            ref_x = (canvas_width - ref_width) // 2
-            ref_y = (canvas_height - ref_height) // 2
+            ref_x = (canvas_width - self.reference_photo.width()) // 2
+            ref_y = (canvas_height - self.reference_photo.height()) // 2
             
             self.preview_canvas.create_image(ref_x, ref_y, anchor=tk.NW, 
                                             image=self.reference_photo, tags="reference")
         
-        # 2. 显示动画精灵（应用缩放）
+        # 2. 显示动画精灵（应用缩放），优先使用缓存中已缩放好的帧
         frame = self.selected_frames[index]
+        key = self.frame_cache_key(frame)
+        self.preview_photo = self.frame_cache.get(key)
+        self.last_frame_cache_hit = self.preview_photo is not None
+        if self.preview_photo is None:
+            sprite = render_frame(self.atlas_image, frame, key[1])
+            if sprite is None:
+                return
+            self.preview_photo = ImageTk.PhotoImage(sprite)
+            self.frame_cache.put(key, self.preview_photo)
+            self.frame_warm_keys.discard(key)
         
-        # 从图集中裁剪精灵
-        sprite = self.atlas_image.crop((
-            frame.x, frame.y,
-            frame.x + frame.width,
-            frame.y + frame.height
-        ))
+        # 居中显示动画精灵
+        x = (canvas_width - self.preview_photo.width()) // 2
+        y = (canvas_height - self.preview_photo.height()) // 2
         
-        # 应用动画缩放
-        animation_preview_scale = base_preview_scale * self.animation_scale
-        preview_width = int(sprite.width * animation_preview_scale)
-        preview_height = int(sprite.height * animation_preview_scale)
+        self.preview_canvas.create_image(x, y, anchor=tk.NW, 
+                                        image=self.preview_photo, tags="animation")
+    
+    def draw_hud(self):
+        """在预览画布左上角叠加本次播放的性能信息"""
+        self.preview_canvas.delete("hud")
+        if not self.show_hud.get() or not self.playback_stats:
+            return
         
-        if preview_width > 0 and preview_height > 0:
-            sprite = sprite.resize((preview_width, preview_height), Image.NEAREST)
-            
-            # 显示在预览画布上
-            self.preview_photo = ImageTk.PhotoImage(sprite)
-            
-            # 居中显示动画精灵
-            x = (canvas_width - preview_width) // 2
-            y = (canvas_height - preview_height) // 2
-            
-            self.preview_canvas.create_image(x, y, anchor=tk.NW, 
-                                            image=self.preview_photo, tags="animation")
+        stats = self.playback_stats
+        recent = [stats[i].render_ms for i in range(max(0, len(stats) - HUD_WINDOW), len(stats))]
+        # 丢帧与命中率都按保留的记录统计，和CSV导出的数据一致
+        text = (
+            f"目标 {self.scheduler.fps:.0f} FPS | 实际 {self.scheduler.achieved_fps:.1f} FPS\n"
+            f"渲染 {recent[-1]:.1f}ms (平均 {sum(recent) / len(recent):.1f} / 最大 {max(recent):.1f})\n"
+            f"抖动 {self.scheduler.jitter_ms:.1f}ms | 缓存命中 {stats.hit_rate:.0%}\n"
+            f"丢帧 {stats.skipped} / {len(stats) + stats.skipped}"
+        )
+        text_item = self.preview_canvas.create_text(6, 6, anchor=tk.NW, text=text, fill='#00ff00',
+                                                    font=("Courier", 9), tags="hud")
+        x1, y1, x2, y2 = self.preview_canvas.bbox(text_item)
+        background = self.preview_canvas.create_rectangle(x1 - 3, y1 - 3, x2 + 3, y2 + 3,
+                                                          fill='black', outline='#00ff00', tags="hud")
+        self.preview_canvas.tag_lower(background, text_item)
+    
+    def export_playback_stats(self):
+        """把本次播放的逐帧性能记录导出为CSV"""
+        if not self.playback_stats:
+            messagebox.showwarning("警告", "没有可导出的播放数据，请先播放动画")
+            return
+        
+        file_path = filedialog.asksaveasfilename(
+            title="导出性能数据",
+            defaultextension=".csv",
+            initialfile="playback_stats.csv",
+            filetypes=[("CSV文件", "*.csv"), ("所有文件", "*.*")]
+        )
+        if not file_path:
+            return
+        
+        with open(file_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['time_ms', 'frame', 'skipped', 'late_ms', 'render_ms', 'cache_hit',
+                             'target_fps'])
+            for stat in self.playback_stats:
+                writer.writerow([f"{stat.time_ms:.3f}", stat.frame, stat.skipped, f"{stat.late_ms:.3f}",
+                                 f"{stat.render_ms:.3f}", int(stat.cache_hit), f"{stat.target_fps:g}"])
+        
+        messagebox.showinfo("导出成功", f"已导出 {len(self.playback_stats)} 帧的性能数据\n{file_path}")
+    
+    def frame_cache_key(self, frame: FrameInfo) -> Tuple[int, float]:
+        return frame.index, round(BASE_PREVIEW_SCALE * self.animation_scale, 3)
+    
+    def invalidate_frame_cache(self):
+        """缩放或图集变化后清空预览帧缓存，排队中的旧请求随之作废"""
+        self.frame_cache_generation += 1
+        self.frame_cache.clear()
+        self.frame_warm_keys = set()
+    
+    def warm_frame_cache(self):
+        """在后台为当前选中的帧生成缩放后的图像，累计大小超过内存上限后不再预热"""
+        if not self.atlas_image:
+            return
+        budget = self.frame_cache.capacity - self.frame_cache.total_size
+        for frame in self.selected_frames:
+            key = self.frame_cache_key(frame)
+            if key in self.frame_cache or key in self.frame_warm_keys:
+                continue
+            budget -= int(frame.width * frame.height * key[1] * key[1] * 4)
+            if budget < 0:
+                break
+            self.frame_warm_keys.add(key)
+            self.frame_requests.put((self.frame_cache_generation, key, self.atlas_image, frame))
+        
+        if self.frame_warm_keys and not self.frame_polling:
+            self.frame_polling = True
+            self.root.after(30, self.poll_frame_results)
+    
+    def run_frame_worker(self):
+        """后台线程：裁切并缩放帧；PhotoImage 只能在主线程创建"""
+        while True:
+            generation, key, atlas, frame = self.frame_requests.get()
+            if generation != self.frame_cache_generation or key not in self.frame_warm_keys:
+                continue
+            self.frame_results.put((generation, key, render_frame(atlas, frame, key[1])))
+    
+    def poll_frame_results(self):
+        while True:
+            try:
+                generation, key, sprite = self.frame_results.get_nowait()
+            except queue.Empty:
+                break
+            if generation != self.frame_cache_generation or key not in self.frame_warm_keys:
+                continue
+            self.frame_warm_keys.discard(key)
+            if sprite is not None:
+                self.frame_cache.put(key, ImageTk.PhotoImage(sprite))
+        
+        self.frame_polling = bool(self.frame_warm_keys)
+        if self.frame_polling:
+            self.root.after(30, self.poll_frame_results)
     
     def reset_animation(self):
         """重置动画"""
         self.is_playing = False
+        self.stop_animation_timer()
         self.play_button.config(text="▶ 播放")
         self.current_frame_index = 0
         self.frame_info_label.config(text="帧: 0/0")
@@ -648,6 +1025,7 @@ class AnimationPreviewApp:
     def on_fps_change(self):
         """帧率变化"""
         self.frame_rate = self.fps_var.get()
+        self.scheduler.set_fps(self.frame_rate)
     
     def add_action_group(self):
         """添加动作组"""
@@ -667,7 +1045,7 @@ class AnimationPreviewApp:
         # 创建动作组
         action = ActionGroup(name)
         for frame in sorted(self.selected_frames, key=lambda f: f.index):
-            action.frames.append((frame.row, frame.col))
+            action.frames.append(frame.index)
         
         self.action_groups[name] = action
         
@@ -693,18 +1071,20 @@ class AnimationPreviewApp:
             action = self.action_groups[action_name]
             
             # 清除当前选择
+            previous = self.selected_frames
             for frame in self.frames:
                 frame.selected = False
             self.selected_frames = []
             
             # 选中动作组的帧
-            for row, col in action.frames:
-                for frame in self.frames:
-                    if frame.row == row and frame.col == col:
-                        frame.selected = True
-                        self.selected_frames.append(frame)
+            for index in action.frames:
+                frame = self.frames[index]
+                frame.selected = True
+                self.selected_frames.append(frame)
             
-            self.display_atlas()
+            self.refresh_frame_overlays(previous + self.selected_frames)
+            self.warm_frame_cache()
+            self.reset_playback_stats()
     
     def preview_action(self):
         """预览选中的动作"""
@@ -776,10 +1156,20 @@ class AnimationPreviewApp:
             "frame_rate": self.frame_rate
         }
         
-        # 添加动作组
+        # 添加动作组：frames 为兼容旧格式的 [行, 列]，去重后重复帧的行列相同，
+        # sprites 按 metadata 中的精灵下标和名称逐帧记录，可区分共用同一区域的帧
         for name, action in self.action_groups.items():
+            frames = [self.frames[index] for index in action.frames]
             export_data["actions"][name] = {
-                "frames": action.frames,
+                "frames": [[frame.row, frame.col] for frame in frames],
+                "sprites": [{
+                    "index": frame.index,
+                    "name": frame.name,
+                    # 去重时合并的镜像/旋转帧：先逆时针旋转90°，再水平、垂直翻转
+                    "rotated": frame.rotated,
+                    "flipX": frame.flip_x,
+                    "flipY": frame.flip_y
+                } for frame in frames],
                 "frame_count": action.frame_count
             }
         
@@ -873,6 +1263,7 @@ class AnimationPreviewApp:
         else:
             # 使用完整图片
             self.selected_reference_sprite = self.reference_atlas
+        self.reference_photo = None
         
         # 刷新预览
         if self.selected_frames:
@@ -880,7 +1271,11 @@ class AnimationPreviewApp:
     
     def on_animation_scale_change(self, value):
         """动画缩放变化"""
-        self.animation_scale = float(value)
+        scale = float(value)
+        if scale != self.animation_scale:
+            self.animation_scale = scale
+            self.invalidate_frame_cache()
+            self.warm_frame_cache()
         self.scale_info_label.config(text=f"当前缩放: {self.animation_scale:.1f}x")
         
         # 刷新预览
@@ -889,13 +1284,8 @@ class AnimationPreviewApp:
     
     def reset_animation_scale(self):
         """重置动画缩放"""
-        self.animation_scale = 1.0
         self.animation_scale_var.set(1.0)
-        self.scale_info_label.config(text="当前缩放: 1.0x")
-        
-        # 刷新预览
-        if self.selected_frames:
-            self.show_preview_frame(self.current_frame_index)
+        self.on_animation_scale_change(1.0)
 
 
 def main():
@@ -0,0 +1,121 @@
+import base64
+import io
+import json
+import os
+from typing import Dict, List, Optional
+
+from PIL import Image
+
+
+CATALOG_FILE = 'atlas_catalog.json'
+CATALOG_VERSION = 1
+THUMBNAIL_SIZE = 64
+
+
+def load_catalog(output_dir: str) -> Dict[str, Dict]:
+    """读取已保存的目录，返回 {文件夹名: 条目}；文件不存在或损坏时返回空目录"""
+    try:
+        with open(os.path.join(output_dir, CATALOG_FILE), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get('version') != CATALOG_VERSION:
+        return {}
+    return data.get('entries', {})
+
+
+def save_catalog(output_dir: str, entries: Dict[str, Dict]):
+    # 先写临时文件再替换，多个预览窗口同时刷新也不会读到写了一半的文件
+    path = os.path.join(output_dir, CATALOG_FILE)
+    temp_path = f"{path}.tmp{os.getpid()}"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': CATALOG_VERSION, 'entries': entries}, f, indent=2, ensure_ascii=False)
+    os.replace(temp_path, path)
+
+
+def update_catalog(output_dir: str, entries: Optional[Dict[str, Dict]] = None) -> Dict[str, Dict]:
+    """扫描导出目录，只解析新增或 metadata.json 有变化的文件夹，删除已不存在的条目
+
+    每个文件夹只 stat 一次 metadata.json，用 (修改时间, 文件大小) 判断是否变化；
+    非图集导出也记录在目录中，避免每次启动重复解析。目录有变化时写回文件。
+    """
+    if entries is None:
+        entries = load_catalog(output_dir)
+    if not os.path.isdir(output_dir):
+        return {}
+
+    updated = {}
+    changed = False
+    for item in os.scandir(output_dir):
+        if not item.is_dir():
+            continue
+        try:
+            stat = os.stat(os.path.join(item.path, 'metadata.json'))
+        except OSError:
+            continue
+
+        entry = entries.get(item.name)
+        if entry is None or entry.get('mtime') != stat.st_mtime_ns or entry.get('file_size') != stat.st_size:
+            entry = read_entry(item.path, stat)
+            changed = True
+        updated[item.name] = entry
+
+    if changed or set(updated) != set(entries):
+        try:
+            save_catalog(output_dir, updated)
+        except OSError:
+            # 目录只是加速启动的缓存，写不进去时下次重新解析即可
+            pass
+    return updated
+
+
+def read_entry(folder_path: str, stat: os.stat_result) -> Dict:
+    """解析一个导出文件夹的 metadata.json，图集导出还会生成缩略图"""
+    entry = {
+        'name': os.path.basename(folder_path),
+        'export_mode': None,
+        'mtime': stat.st_mtime_ns,
+        'file_size': stat.st_size
+    }
+    try:
+        with open(os.path.join(folder_path, 'metadata.json'), 'r', encoding='utf-8') as f:
+            metadata = json.load(f)
+    except (OSError, ValueError):
+        return entry
+
+    entry['export_mode'] = metadata.get('export_mode')
+    entry['sprite_count'] = metadata.get('sprite_count', 0)
+    if entry['export_mode'] != 'atlas':
+        return entry
+
+    atlas_size = metadata.get('atlas_size', {})
+    entry['atlas_name'] = metadata.get('atlas_name', entry['name'])
+    entry['atlas_size'] = [atlas_size.get('width', 0), atlas_size.get('height', 0)]
+    entry['thumbnail'] = make_thumbnail(os.path.join(folder_path, metadata.get('atlas_file', '')))
+    return entry
+
+
+def make_thumbnail(atlas_path: str, size: int = THUMBNAIL_SIZE) -> Optional[str]:
+    """生成图集缩略图，返回 base64 编码的PNG（可直接作为 tk.PhotoImage 的 data）"""
+    try:
+        with Image.open(atlas_path) as image:
+            image.thumbnail((size, size), Image.Resampling.LANCZOS)
+            buffer = io.BytesIO()
+            image.save(buffer, format='PNG')
+    except (OSError, ValueError):
+        return None
+    return base64.b64encode(buffer.getvalue()).decode('ascii')
+
+
+def atlas_entries(entries: Dict[str, Dict], query: str = '') -> List[Dict]:
+    """按名称排序的图集条目，query 不区分大小写地匹配文件夹名或图集名"""
+    query = query.strip().lower()
+    result = []
+    for name in sorted(entries):
+        entry = entries[name]
+        if entry.get('export_mode') != 'atlas':
+            continue
+        if query and query not in name.lower() and query not in entry.get('atlas_name', '').lower():
+            continue
+        result.append(entry)
+    return result
@@ -0,0 +1,352 @@
+import math
+import numpy as np
+from typing import List, Tuple, Optional
+from dataclasses import dataclass
+
+
+@dataclass
+class PackResult:
+    """打包结果，positions 与输入尺寸顺序一一对应"""
+    positions: List[Tuple[int, int]]
+    width: int
+    height: int
+    used_area: int
+    strategy: str = 'skyline'
+
+    @property
+    def efficiency(self) -> float:
+        """精灵总面积 / 图集面积"""
+        atlas_area = self.width * self.height
+        return self.used_area / atlas_area if atlas_area else 0.0
+
+
+class MaxRectsPacker:
+    """MaxRects 装箱，按最短边优先（Best Short Side Fit）选择空闲矩形"""
+
+    def __init__(self, width: int, height: int, min_size: Tuple[int, int] = (1, 1)):
+        self.width = width
+        self.height = height
+        # 比所有待放矩形都窄或都矮的空闲矩形永远用不上，直接丢弃
+        self.min_size = min_size
+        # 空闲矩形 (x1, y1, x2, y2)，用数组批量计算评分与切分
+        self.free_rects = np.array([[0, 0, width, height]], dtype=np.int64)
+
+    @staticmethod
+    def sort_key(size: Tuple[int, int]):
+        return (max(size), size[0] * size[1])
+
+    def insert(self, width: int, height: int) -> Optional[Tuple[int, int]]:
+        free = self.free_rects
+        leftover_x = free[:, 2] - free[:, 0] - width
+        leftover_y = free[:, 3] - free[:, 1] - height
+        fits = (leftover_x >= 0) & (leftover_y >= 0)
+        if not fits.any():
+            return None
+
+        short_side = np.where(fits, np.minimum(leftover_x, leftover_y), np.iinfo(np.int64).max)
+        long_side = np.maximum(leftover_x, leftover_y)
+        candidates = np.flatnonzero(short_side == short_side.min())
+        best = candidates[np.argmin(long_side[candidates])]
+
+        x, y = int(free[best, 0]), int(free[best, 1])
+        self._split_free_rects(x, y, x + width, y + height)
+        return x, y
+
+    def _split_free_rects(self, x1: int, y1: int, x2: int, y2: int):
+        free = self.free_rects
+        hit = ((free[:, 0] < x2) & (free[:, 2] > x1) &
+               (free[:, 1] < y2) & (free[:, 3] > y1))
+        kept = free[~hit]
+
+        created = []
+        for fx1, fy1, fx2, fy2 in free[hit].tolist():
+            if x1 > fx1:
+                created.append((fx1, fy1, x1, fy2))
+            if x2 < fx2:
+                created.append((x2, fy1, fx2, fy2))
+            if y1 > fy1:
+                created.append((fx1, fy1, fx2, y1))
+            if y2 < fy2:
+                created.append((fx1, y2, fx2, fy2))
+
+        if not created:
+            self.free_rects = kept
+            return
+
+        # 原有空闲矩形之间互不包含，只需处理新产生的矩形
+        new = np.array(created, dtype=np.int64)
+        new = new[(new[:, 2] - new[:, 0] >= self.min_size[0]) &
+                  (new[:, 3] - new[:, 1] >= self.min_size[1])]
+        inside_new = _containment(new, new)
+        np.fill_diagonal(inside_new, False)
+        # 完全相同的矩形只保留第一个
+        same = inside_new & inside_new.T
+        inside_new &= ~same | np.tri(len(new), k=-1, dtype=bool)
+        redundant = inside_new.any(axis=1) | _containment(new, kept).any(axis=1)
+        new = new[~redundant]
+
+        swallowed = _containment(kept, new).any(axis=1)
+        self.free_rects = np.concatenate([kept[~swallowed], new])
+
+
+class SkylinePacker:
+    """Skyline 装箱，按最低落点（Bottom-Left）放置"""
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.skyline = [[0, 0, width]]  # [x, y, 段宽]
+
+    @staticmethod
+    def sort_key(size: Tuple[int, int]):
+        return (size[1], size[0])
+
+    def insert(self, width: int, height: int) -> Optional[Tuple[int, int]]:
+        best_index = None
+        best_top = best_width = None
+        best_y = 0
+
+        for i in range(len(self.skyline)):
+            y = self._fit(i, width, height)
+            if y is None:
+                continue
+            top = y + height
+            segment_width = self.skyline[i][2]
+            if best_index is None or (top, segment_width) < (best_top, best_width):
+                best_index, best_top, best_width, best_y = i, top, segment_width, y
+
+        if best_index is None:
+            return None
+
+        x = self.skyline[best_index][0]
+        self._add_level(best_index, x, best_y + height, width)
+        return x, best_y
+
+    def _fit(self, index: int, width: int, height: int) -> Optional[int]:
+        x = self.skyline[index][0]
+        if x + width > self.width:
+            return None
+
+        y = 0
+        remaining = width
+        i = index
+        while remaining > 0:
+            y = max(y, self.skyline[i][1])
+            if y + height > self.height:
+                return None
+            remaining -= self.skyline[i][2]
+            i += 1
+        return y
+
+    def _add_level(self, index: int, x: int, top: int, width: int):
+        self.skyline.insert(index, [x, top, width])
+
+        # 裁掉被新段覆盖的后续段
+        right = x + width
+        i = index + 1
+        while i < len(self.skyline):
+            segment = self.skyline[i]
+            if segment[0] >= right:
+                break
+            shrink = right - segment[0]
+            if segment[2] <= shrink:
+                del self.skyline[i]
+                continue
+            segment[0] += shrink
+            segment[2] -= shrink
+            break
+
+        # 合并等高的相邻段
+        i = 0
+        while i < len(self.skyline) - 1:
+            if self.skyline[i][1] == self.skyline[i + 1][1]:
+                self.skyline[i][2] += self.skyline[i + 1][2]
+                del self.skyline[i + 1]
+            else:
+                i += 1
+
+
+class ShelfPacker:
+    """单层货架装箱：从左到右排满一行后换行"""
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.x = 0
+        self.y = 0
+        self.row_height = 0
+
+    @staticmethod
+    def sort_key(size: Tuple[int, int]):
+        return size[0] * size[1]
+
+    def insert(self, width: int, height: int) -> Optional[Tuple[int, int]]:
+        if self.x + width > self.width:
+            self.x = 0
+            self.y += self.row_height
+            self.row_height = 0
+
+        if width > self.width or self.y + height > self.height:
+            return None
+
+        position = (self.x, self.y)
+        self.x += width
+        self.row_height = max(self.row_height, height)
+        return position
+
+
+# MaxRects 在最优宽度上二分装箱高度的最多尝试次数
+HEIGHT_SEARCH_STEPS = 4
+
+
+PACKERS = {
+    'maxrects': MaxRectsPacker,
+    'skyline': SkylinePacker,
+    'shelf': ShelfPacker,
+}
+
+
+def pack_rects(sizes: List[Tuple[int, int]], strategy: str = 'skyline',
+               padding: int = 0, max_width: int = 2048, max_height: int = 0,
+               power_of_two: bool = False, square: bool = False) -> PackResult:
+    """把矩形打包进不超过 max_width x max_height 的图集（max_height 为0表示不限高度）
+
+    会尝试多个装箱宽度，取满足尺寸约束且面积最小的结果（按实际占用范围裁剪后比较）。
+    """
+    if strategy not in PACKERS:
+        raise ValueError(f"Unknown pack strategy: {strategy}")
+    if not sizes:
+        raise ValueError("No sprites to pack")
+
+    packer_cls = PACKERS[strategy]
+    padded = [(w + padding, h + padding) for w, h in sizes]
+    widest = max(w for w, h in sizes)
+    tallest = max(h for w, h in sizes)
+    if widest > max_width or (max_height > 0 and tallest > max_height):
+        raise ValueError(f"Sprite larger than atlas limit {max_width}x{max_height or '∞'}")
+
+    order = sorted(range(len(sizes)), key=lambda i: packer_cls.sort_key(padded[i]), reverse=True)
+    used_area = sum(w * h for w, h in sizes)
+    options = {}
+    if packer_cls is MaxRectsPacker:
+        options['min_size'] = (min(w for w, h in padded), min(h for w, h in padded))
+
+    def pack(bin_width, bin_height):
+        # 最后一列/行的间距允许超出图集边界
+        return _pack_once(packer_cls(bin_width + padding, bin_height + padding, **options), padded, order)
+
+    def result(positions):
+        width = max(x + w for (x, y), (w, h) in zip(positions, sizes))
+        height = max(y + h for (x, y), (w, h) in zip(positions, sizes))
+        width, height = _apply_constraints(width, height, power_of_two, square)
+        if width > max_width or (max_height > 0 and height > max_height):
+            return None
+        return PackResult(positions, width, height, used_area, strategy)
+
+    def smaller(a, b):
+        return b is None or (a.width * a.height, max(a.width, a.height)) < (b.width * b.height, max(b.width, b.height))
+
+    best = None
+    best_search = None  # 最优结果对应的 (装箱宽度, 放不下的高度+1, 放得下的高度)
+    near_square, fallback = _candidate_widths(padded, widest, max_width, power_of_two)
+    for widths in (near_square, fallback):
+        for bin_width in widths:
+            lower = tallest
+            for bin_height in _candidate_heights(padded, tallest, bin_width, max_height):
+                positions = pack(bin_width, bin_height)
+                if positions is not None:
+                    break
+                lower = bin_height + 1
+            else:
+                continue
+
+            candidate = result(positions)
+            if candidate is not None and smaller(candidate, best):
+                best, best_search = candidate, (bin_width, lower, bin_height)
+
+        # 接近方形的宽度都放不下时才退回到最大宽度，避免得到细长的图集
+        if best is not None:
+            break
+
+    # MaxRects 会把矩形分散到整个装箱高度里，实际占用高度取决于装箱高度，
+    # 因此对最优宽度在放不下与放得下的高度之间二分收紧；其它算法自底向上放置，不受装箱高度影响
+    if best is not None and packer_cls is MaxRectsPacker:
+        bin_width, lower, upper = best_search
+        for _ in range(HEIGHT_SEARCH_STEPS):
+            if lower >= upper:
+                break
+            middle = (lower + upper) // 2
+            positions = pack(bin_width, middle)
+            if positions is None:
+                lower = middle + 1
+                continue
+            upper = middle
+            candidate = result(positions)
+            if candidate is not None and smaller(candidate, best):
+                best = candidate
+
+    if best is None:
+        raise ValueError(f"Sprites do not fit in atlas limit {max_width}x{max_height or '∞'}")
+    return best
+
+
+def _pack_once(packer, padded: List[Tuple[int, int]],
+               order: List[int]) -> Optional[List[Tuple[int, int]]]:
+    positions: List[Optional[Tuple[int, int]]] = [None] * len(padded)
+    for i in order:
+        position = packer.insert(*padded[i])
+        if position is None:
+            return None
+        positions[i] = position
+    return positions
+
+
+def _candidate_widths(padded: List[Tuple[int, int]], widest: int, max_width: int,
+                      power_of_two: bool) -> Tuple[List[int], List[int]]:
+    """返回 (接近方形的候选宽度, 兜底宽度)"""
+    side = math.sqrt(sum(w * h for w, h in padded))
+    if power_of_two:
+        widths = set()
+        for width in (_next_power_of_two(int(side)) // 2, _next_power_of_two(int(side))):
+            width = max(width, _next_power_of_two(widest))
+            if width <= max_width:
+                widths.add(width)
+        fallback = [_previous_power_of_two(max_width)]
+    else:
+        widths = {min(max(int(side * factor), widest), max_width) for factor in (1.0, 1.2, 1.45)}
+        fallback = [max_width]
+    return sorted(widths), [w for w in fallback if w not in widths and w >= widest]
+
+
+def _candidate_heights(padded: List[Tuple[int, int]], tallest: int,
+                       bin_width: int, max_height: int) -> List[int]:
+    # 从面积估算的高度起逐步放宽，装箱高度贴近实际才能让MaxRects排得紧凑
+    limit = max_height if max_height > 0 else sum(h for w, h in padded)
+    base = max(tallest, math.ceil(sum(w * h for w, h in padded) / bin_width))
+    heights = [min(int(base * factor), limit) for factor in (1.05, 1.2, 1.5)]
+    heights.append(limit)
+    return sorted(set(heights))
+
+
+def _apply_constraints(width: int, height: int, power_of_two: bool,
+                       square: bool) -> Tuple[int, int]:
+    if power_of_two:
+        width = _next_power_of_two(width)
+        height = _next_power_of_two(height)
+    if square:
+        width = height = max(width, height)
+    return width, height
+
+
+def _next_power_of_two(value: int) -> int:
+    return 1 << max(0, value - 1).bit_length()
+
+
+def _previous_power_of_two(value: int) -> int:
+    return 1 << (max(1, value).bit_length() - 1)
+
+
+def _containment(inner: np.ndarray, outer: np.ndarray) -> np.ndarray:
+    """result[i, j] 表示 inner[i] 是否被 outer[j] 包含"""
+    return ((outer[None, :, 0] <= inner[:, None, 0]) & (outer[None, :, 1] <= inner[:, None, 1]) &
+            (outer[None, :, 2] >= inner[:, None, 2]) & (outer[None, :, 3] >= inner[:, None, 3]))
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""批量切割工具：无界面地按同一配方切割并导出多张精灵表
+
+用法:
+    python batch_cut.py sheets/ "more/*.png" --recipe recipe.json --output output/batch -j 4
+
+配方(JSON)示例:
+    {
+      "mode": "auto",
+      "auto": {"min_sprite_size": 8, "threshold": 10, "engine": "components", "merge_gap": 4},
+      "select": {"min_width": 16, "min_height": 16},
+      "export": {"mode": "atlas", "format": "png", "trim": true, "pack_strategy": "skyline"}
+    }
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Dict
+
+from sprite_cutter import SpriteCutter, SpriteInfo
+
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.bmp', '.webp')
+
+
+def collect_sheets(patterns: List[str]) -> List[str]:
+    """把目录、通配符或文件路径展开为去重后的图片列表"""
+    sheets = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            paths = [os.path.join(pattern, name) for name in os.listdir(pattern)]
+        else:
+            paths = glob.glob(pattern)
+        sheets.extend(p for p in paths
+                      if os.path.isfile(p) and p.lower().endswith(IMAGE_EXTENSIONS))
+    return sorted(set(sheets))
+
+
+def output_names(sheets: List[str]) -> Dict[str, str]:
+    """为每张精灵表确定输出子目录名：默认用文件名，文件名重复的改用带扩展名的相对路径
+
+    例如 a/hero.png 与 b/hero.png 分别输出到 a_hero_png 与 b_hero_png，避免多个进程写同一目录。
+    """
+    stems = {sheet: os.path.splitext(os.path.basename(sheet))[0] for sheet in sheets}
+    stem_counts = Counter(stems.values())
+    root = os.path.commonpath([os.path.dirname(os.path.abspath(sheet)) for sheet in sheets])
+
+    names = {}
+    for sheet, stem in stems.items():
+        if stem_counts[stem] == 1:
+            names[sheet] = stem
+        else:
+            relative = os.path.relpath(os.path.abspath(sheet), root)
+            names[sheet] = re.sub(r'[\\/.]', '_', relative)
+    return names
+
+
+def cut_sheet(cutter: SpriteCutter, recipe: Dict) -> List[SpriteInfo]:
+    mode = recipe.get('mode', 'grid_size')
+    grid = recipe.get('grid', {})
+
+    if mode == 'grid_size':
+        return cutter.grid_cut_by_size(
+            grid.get('cell_width', 32),
+            grid.get('cell_height', 32),
+            grid.get('padding_x', 0),
+            grid.get('padding_y', 0),
+            grid.get('offset_x', 0),
+            grid.get('offset_y', 0)
+        )
+    elif mode == 'grid_count':
+        return cutter.grid_cut_by_count(
+            grid.get('rows', 4),
+            grid.get('cols', 4),
+            grid.get('padding_x', 0),
+            grid.get('padding_y', 0)
+        )
+    elif mode == 'auto':
+        auto = recipe.get('auto', {})
+        return cutter.auto_cut(
+            auto.get('min_sprite_size', 8),
+            auto.get('threshold', 10),
+            auto.get('engine', 'contours'),
+            auto.get('merge_gap', 0)
+        )
+    elif mode == 'manual':
+        return cutter.manual_cut([tuple(r) for r in recipe.get('regions', [])],
+                                 recipe.get('names'))
+    else:
+        raise ValueError(f"Unknown cut mode: {mode}")
+
+
+def select_sprites(sprites: List[SpriteInfo], rule) -> int:
+    """按配方的选择规则标记精灵，返回选中数量
+
+    rule 为 "all"，或包含 min_width/min_height/max_width/max_height/indices 的字典。
+    """
+    if rule in (None, 'all'):
+        rule = {}
+    elif not isinstance(rule, dict):
+        raise ValueError(f"Unknown selection rule: {rule}")
+
+    indices = set(rule['indices']) if 'indices' in rule else None
+    for i, sprite in enumerate(sprites):
+        sprite.selected = (
+            (indices is None or i in indices) and
+            sprite.width >= rule.get('min_width', 0) and
+            sprite.height >= rule.get('min_height', 0) and
+            sprite.width <= rule.get('max_width', sprite.width) and
+            sprite.height <= rule.get('max_height', sprite.height)
+        )
+    return sum(1 for s in sprites if s.selected)
+
+
+def process_sheet(sheet_path: str, recipe: Dict, output_dir: str) -> Dict:
+    """在工作进程中处理一张精灵表，返回各阶段耗时与结果"""
+    result = {'sheet': sheet_path, 'ok': False, 'sprites': 0, 'selected': 0, 'timings': {}}
+    timings = result['timings']
+    start = time.perf_counter()
+
+    try:
+        stage = time.perf_counter()
+        cutter = SpriteCutter(sheet_path)
+        timings['load'] = time.perf_counter() - stage
+
+        stage = time.perf_counter()
+        sprites = cut_sheet(cutter, recipe)
+        result['sprites'] = len(sprites)
+        result['selected'] = select_sprites(sprites, recipe.get('select', 'all'))
+        timings['cut'] = time.perf_counter() - stage
+
+        if result['selected']:
+            export = dict(recipe.get('export', {}))
+            # 进程池已经占满CPU，编码线程默认只用一个
+            export.setdefault('workers', 1)
+
+            stage = time.perf_counter()
+            metadata = cutter.export_selected_sprites(output_dir, **export)
+            timings['export'] = time.perf_counter() - stage
+            result['output'] = output_dir
+            result['exported'] = metadata['sprite_count']
+
+        result['ok'] = True
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+
+    timings['total'] = time.perf_counter() - start
+    return result
+
+
+def format_result(result: Dict) -> str:
+    timings = ' '.join(f"{k}={v:.2f}s" for k, v in result['timings'].items())
+    name = os.path.basename(result['sheet'])
+    if not result['ok']:
+        return f"✗ {name}: {result['error']} ({timings})"
+    return f"✓ {name}: {result['sprites']} 个精灵, 选中 {result['selected']} ({timings})"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="按配方批量切割并导出精灵表（无界面）")
+    parser.add_argument('sheets', nargs='+', help="精灵表文件、目录或通配符")
+    parser.add_argument('-r', '--recipe', required=True, help="切割配方JSON文件")
+    parser.add_argument('-o', '--output', default=os.path.join('output', 'batch'),
+                        help="输出根目录，每张精灵表导出到其中的同名子目录（文件名重复时用相对路径命名）")
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(),
+                        help="并行进程数（默认CPU核数）")
+    args = parser.parse_args(argv)
+
+    with open(args.recipe, 'r', encoding='utf-8') as f:
+        recipe = json.load(f)
+
+    sheets = collect_sheets(args.sheets)
+    if not sheets:
+        print("未找到精灵表", file=sys.stderr)
+        return 1
+
+    names = output_names(sheets)
+    duplicates = [name for name, n in Counter(names.values()).items() if n > 1]
+    if duplicates:
+        print(f"多张精灵表会输出到同一目录: {', '.join(sorted(duplicates))}", file=sys.stderr)
+        return 1
+
+    print(f"处理 {len(sheets)} 张精灵表，{args.jobs} 个进程")
+    start = time.perf_counter()
+    results = []
+
+    with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+        futures = [executor.submit(process_sheet, sheet, recipe, os.path.join(args.output, names[sheet]))
+                   for sheet in sheets]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            print(format_result(result), flush=True)
+
+    wall_time = time.perf_counter() - start
+    succeeded = [r for r in results if r['ok']]
+    stage_totals = {}
+    for r in succeeded:
+        for stage, seconds in r['timings'].items():
+            stage_totals[stage] = stage_totals.get(stage, 0.0) + seconds
+
+    print()
+    print("汇总")
+    print(f"  精灵表: {len(succeeded)} 成功 / {len(results) - len(succeeded)} 失败")
+    print(f"  精灵: {sum(r['sprites'] for r in succeeded)} 个切出, "
+          f"{sum(r.get('exported', 0) for r in succeeded)} 个导出")
+    print(f"  墙钟时间: {wall_time:.2f}s ({len(results) / wall_time:.1f} 张/秒)")
+    for stage, seconds in stage_totals.items():
+        print(f"  {stage} 累计: {seconds:.2f}s")
+
+    return 0 if len(succeeded) == len(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
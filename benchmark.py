@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""SpriteCutter 性能基准：用合成精灵表测量各阶段耗时、峰值内存和图集面积
+
+用法:
+    python benchmark.py                                   # 默认 1k² / 2k² / 4k²
+    python benchmark.py --sizes 1024,4096,16384 --repeat 3
+    python benchmark.py --save-baseline benchmark_baseline.json
+    python benchmark.py --baseline benchmark_baseline.json --threshold 0.2
+
+与基准比较时，耗时或图集面积超出 (1 + threshold) 倍即视为回退，进程以状态码1退出。
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+from PIL import Image
+
+from sprite_cutter import SpriteCutter
+
+
+# 密度：有内容的单元格比例
+DENSITIES = {'sparse': 0.3, 'dense': 0.9}
+
+
+def generate_sheet(size: int, cell: int, density: float, seed: int = 0) -> np.ndarray:
+    """生成 size x size 的RGBA精灵表：每个被占用的单元格里放一个随机大小、随机颜色的不透明矩形"""
+    rng = np.random.default_rng(seed)
+    cells = size // cell
+    occupied = rng.random((cells, cells)) < density
+    # 每个精灵在单元格内的 [起点, 终点)，至少留1像素透明边
+    start = rng.integers(1, cell // 4, size=(cells, cells, 2))
+    end = cell - rng.integers(1, cell // 4, size=(cells, cells, 2))
+    colors = rng.integers(0, 256, size=(cells, cells, 3), dtype=np.uint8)
+
+    sheet = np.zeros((size, size, 4), dtype=np.uint8)
+    local = np.arange(cell)
+    # 按单元格行生成，避免为整张大图分配中间数组
+    for row in range(cells):
+        inside_y = ((local[:, None] >= start[row, :, 1]) & (local[:, None] < end[row, :, 1]))
+        inside_x = ((local[:, None] >= start[row, :, 0]) & (local[:, None] < end[row, :, 0]))
+        # mask[ly, col, lx]
+        mask = inside_y[:, :, None] & inside_x.T[None, :, :] & occupied[row][None, :, None]
+        mask = mask.reshape(cell, cells * cell)
+        block = sheet[row * cell:(row + 1) * cell, :cells * cell]
+        block[..., :3] = np.repeat(colors[row], cell, axis=0)[None, :, :]
+        block[..., 3] = mask * 255
+    return sheet
+
+
+def measure(func: Callable, repeat: int) -> Tuple[object, Dict[str, float]]:
+    """多次运行取最短耗时，再单独运行一次记录 tracemalloc 峰值（仅统计Python/numpy分配）
+
+    tracemalloc 会显著拖慢纯Python代码，所以计时与内存统计分开进行。
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    tracemalloc.start()
+    result = func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, {'time': round(best, 4), 'peak_mb': round(peak / 2 ** 20, 2)}
+
+
+def run_scenario(size: int, cell: int, density_name: str, repeat: int,
+                 export_limit: int, work_dir: str) -> Dict:
+    sheet = generate_sheet(size, cell, DENSITIES[density_name])
+    sheet_path = os.path.join(work_dir, 'sheet.png')
+    Image.fromarray(sheet).save(sheet_path, compress_level=1)
+    del sheet
+
+    stages = {}
+    cutter, stages['load'] = measure(lambda: SpriteCutter(sheet_path), repeat)
+
+    def uncached(cut):
+        # 每次都清空切割结果缓存，否则第一次之后测到的只是缓存命中
+        def run():
+            cutter.cut_cache.clear()
+            # 和 load_image 一样同步缓存代数，切割结果照常写入缓存，计入写缓存的开销
+            cutter.cut_generation = cutter.cut_cache.generation
+            return cut()
+        return run
+
+    grid, stages['grid_cut'] = measure(uncached(lambda: cutter.grid_cut_by_size(cell, cell)), repeat)
+    _, stages['trim'] = measure(lambda: cutter.trim_sprites(grid), repeat)
+    _, stages['auto_cut_contours'] = measure(uncached(lambda: cutter.auto_cut(engine='contours')), repeat)
+    auto, stages['auto_cut_components'] = measure(
+        uncached(lambda: cutter.auto_cut(engine='components', merge_gap=2)), repeat)
+
+    # 打包与导出的耗时随精灵数超线性增长，只取前 export_limit 个精灵
+    for sprite in auto[:export_limit]:
+        sprite.selected = True
+    selected = [s for s in auto if s.selected]
+
+    packing = {}
+    for strategy in ('maxrects', 'skyline'):
+        result, stages[f'pack_{strategy}'] = measure(
+            lambda: cutter._pack_sprites(selected, 2, strategy, max_width=16384), repeat)
+        packing[strategy] = {
+            'atlas_area': result.width * result.height,
+            'efficiency': round(result.efficiency, 4)
+        }
+
+    export_dir = os.path.join(work_dir, 'export')
+    for mode in ('individual', 'atlas'):
+        def export():
+            shutil.rmtree(export_dir, ignore_errors=True)
+            return cutter.export_selected_sprites(export_dir, mode=mode, max_atlas_width=16384)
+        _, stages[f'export_{mode}'] = measure(export, repeat)
+    shutil.rmtree(export_dir, ignore_errors=True)
+
+    return {
+        'size': size,
+        'cell': cell,
+        'density': density_name,
+        'sprites': len(auto),
+        'exported': len(selected),
+        'stages': stages,
+        'packing': packing
+    }
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float) -> List[str]:
+    """返回所有超出阈值的回退项描述"""
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        for stage, metrics in result['stages'].items():
+            old = base['stages'].get(stage, {}).get('time')
+            # 太短的阶段受计时噪声影响大，不参与比较
+            if old and old >= 0.005 and metrics['time'] > old * (1 + threshold):
+                regressions.append(f"{key} {stage}: {old:.4f}s -> {metrics['time']:.4f}s "
+                                   f"(+{metrics['time'] / old - 1:.0%})")
+        for strategy, packing in result['packing'].items():
+            old = base['packing'].get(strategy, {}).get('atlas_area')
+            if old and packing['atlas_area'] > old * (1 + threshold):
+                regressions.append(f"{key} pack_{strategy} atlas_area: {old} -> {packing['atlas_area']}")
+    return regressions
+
+
+def print_result(key: str, result: Dict):
+    print(f"== {key}: {result['sprites']} 个精灵（打包/导出 {result['exported']} 个）")
+    for stage, metrics in result['stages'].items():
+        print(f"  {stage:<22} {metrics['time']:>9.4f}s  peak {metrics['peak_mb']:>8.2f} MB")
+    for strategy, packing in result['packing'].items():
+        print(f"  atlas[{strategy}]{'':<13} {packing['atlas_area']:>10} px²  "
+              f"efficiency {packing['efficiency']:.1%}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="SpriteCutter 性能基准")
+    parser.add_argument('--sizes', default='1024,2048,4096',
+                        help="精灵表边长列表，逗号分隔（最大16384）")
+    parser.add_argument('--cells', default='32,128', help="精灵单元格边长列表，决定精灵数量")
+    parser.add_argument('--densities', default=','.join(DENSITIES), help="密度列表：sparse,dense")
+    parser.add_argument('--repeat', type=int, default=1, help="每个阶段重复次数，取最短耗时")
+    parser.add_argument('--export-limit', type=int, default=2000, help="打包/导出阶段使用的最大精灵数")
+    parser.add_argument('--baseline', help="与此基准JSON比较")
+    parser.add_argument('--threshold', type=float, default=0.2, help="回退阈值（0.2 表示慢20%%）")
+    parser.add_argument('--save-baseline', help="把本次结果保存为基准JSON")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(',')]
+    cells = [int(c) for c in args.cells.split(',')]
+    densities = args.densities.split(',')
+    for density in densities:
+        if density not in DENSITIES:
+            raise ValueError(f"Unknown density: {density}")
+
+    results = {}
+    work_dir = tempfile.mkdtemp(prefix='sprite_benchmark_')
+    try:
+        for size in sizes:
+            for cell in cells:
+                for density in densities:
+                    key = f"{size}px/cell{cell}/{density}"
+                    results[key] = run_scenario(size, cell, density, args.repeat,
+                                                args.export_limit, work_dir)
+                    print_result(key, results[key])
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    # ru_maxrss 在Linux上以KB为单位，包含cv2/Pillow等原生分配
+    print(f"\n进程峰值RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump({
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'results': results
+            }, f, indent=2)
+        print(f"基准已保存: {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n发现 {len(regressions)} 项性能回退（阈值 {args.threshold:.0%}）:")
+            for line in regressions:
+                print(f"  ✗ {line}")
+            return 1
+        print(f"\n未发现超过 {args.threshold:.0%} 的性能回退")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
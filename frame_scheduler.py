@@ -0,0 +1,76 @@
+import math
+import time
+from collections import deque
+from typing import Callable, Optional
+
+
+class FrameScheduler:
+    """按单调时钟上的截止时间推进动画帧
+
+    第 k 帧的截止时间为 起点 + k × 帧间隔，由起点累加得到而不是由上一帧的实际时刻推算，
+    因此不会累积漂移。回调来迟超过一个帧间隔时跳过错过的帧，保持动画整体速度不变。
+    最近 window 帧的实际显示时刻用于统计实际帧率和抖动（实际显示时刻与截止时间之差）。
+    """
+
+    def __init__(self, fps: float, clock: Callable[[], float] = time.perf_counter, window: int = 60):
+        self.clock = clock
+        self.interval = 1.0 / fps
+        self.deadline: Optional[float] = None
+        self.presented = deque(maxlen=window)  # (显示时刻, 相对截止时间的延迟)
+        self.dropped = 0
+
+    @property
+    def fps(self) -> float:
+        return 1.0 / self.interval
+
+    def set_fps(self, fps: float):
+        """修改帧率，下一帧从上一帧的截止时间起按新间隔计算"""
+        if fps <= 0:
+            raise ValueError("fps must be positive")
+        interval = 1.0 / fps
+        if self.deadline is not None:
+            self.deadline += interval - self.interval
+        self.interval = interval
+
+    def start(self):
+        """从现在开始计时，第一帧立即到期，并清空统计"""
+        self.deadline = self.clock()
+        self.presented.clear()
+        self.dropped = 0
+
+    def stop(self):
+        self.deadline = None
+
+    def delay_ms(self) -> int:
+        """距离下一帧截止时间的毫秒数，向上取整，避免定时器提前触发"""
+        if self.deadline is None:
+            return 0
+        # 减去微小量，避免浮点误差把整毫秒向上多取1ms
+        return max(0, math.ceil((self.deadline - self.clock()) * 1000 - 1e-6))
+
+    def tick(self) -> int:
+        """定时器触发时调用，返回需要跳过的帧数；之后应显示一帧并把截止时间推进到下一帧"""
+        now = self.clock()
+        if self.deadline is None:
+            self.deadline = now
+        skipped = max(0, int((now - self.deadline) // self.interval))
+        self.deadline += skipped * self.interval
+        self.dropped += skipped
+        self.presented.append((now, now - self.deadline))
+        self.deadline += self.interval
+        return skipped
+
+    @property
+    def achieved_fps(self) -> float:
+        """最近 window 帧的实际显示帧率"""
+        if len(self.presented) < 2:
+            return 0.0
+        elapsed = self.presented[-1][0] - self.presented[0][0]
+        return (len(self.presented) - 1) / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def jitter_ms(self) -> float:
+        """最近 window 帧实际显示时刻偏离截止时间的平均值（毫秒）"""
+        if not self.presented:
+            return 0.0
+        return sum(abs(late) for _, late in self.presented) / len(self.presented) * 1000
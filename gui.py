@@ -1,11 +1,22 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, Canvas, Scrollbar, Frame, Label
-from PIL import Image, ImageTk
+from PIL import ImageTk, ImageDraw
 import os
-from sprite_cutter import SpriteCutter, SpriteInfo
+import queue
+import numpy as np
+import threading
+from sprite_cutter import SpriteCutter, SpriteInfo, CutCancelled, ATLAS_EXPORT_PHASES
+from tile_renderer import TilePyramid
+from thumbnail_strip import ThumbnailStrip
+from lru_cache import LRUCache
+import tracing
 from typing import List, Optional
 
 
+# 精灵数超过此值时，边框不再逐个创建画布对象，而是直接画进显示分块
+OVERLAY_ITEM_LIMIT = 5000
+
+
 class SpriteSheetGUI:
     def __init__(self, root):
         self.root = root
@@ -14,17 +25,43 @@ class SpriteSheetGUI:
         
         self.cutter = SpriteCutter()
         self.current_image = None
-        self.display_image = None
-        self.canvas_image_id = None
+        # 画布按分块显示：只生成可见区域的分块，PhotoImage 按 (缩放, 列, 行) 缓存
+        self.tile_pyramid = None
+        self.tile_cache = LRUCache(256)
+        self.tile_items = {}
+        self.tile_render_pending = False
         self.scale_factor = 1.0
         self.sprites = []
         self.manual_selections = []
         self.current_selection = None
         self.selection_start = None
-        self.preview_labels = []
-        self.sprite_rectangles = {}
+        self.band_start = None
+        self.band_rect = None
+        # 覆盖层：sprite_items[i] 为第i个精灵边框的画布对象，缩放时用 canvas.scale 整体变换
+        self.sprite_items = []
+        self.overlay_scale = 1.0
+        self.overlay_item_limit = OVERLAY_ITEM_LIMIT
+        self.overlay_rasterized = False
+        
+        # 网格实时预览：参数变化后防抖重算单元格几何，不裁切像素
+        self.grid_preview = None
+        self.grid_preview_after = None
         self.selected_count = 0
         
+        # 后台切割：每次切割分配递增的任务号，只应用最新任务的结果
+        self.cut_job_id = 0
+        self.cut_cancel_event = None
+        self.cut_events = queue.Queue()
+        self.cut_polling = False
+        
+        # 导出任务队列：单个后台线程依次执行，每个任务带有提交时的选择快照
+        self.export_jobs = []
+        self.export_job_counter = 0
+        self.export_queue = queue.Queue()
+        self.export_events = queue.Queue()
+        self.export_worker = None
+        self.export_polling = False
+        
         self.setup_ui()
         
     def setup_ui(self):
@@ -86,10 +123,20 @@ class SpriteSheetGUI:
         v_scrollbar = Scrollbar(canvas_frame, orient=tk.VERTICAL)
         v_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
+        # 滚动和窗口尺寸变化时补齐新露出的分块
+        def on_xscroll(*args):
+            h_scrollbar.set(*args)
+            self.schedule_tile_render()
+        
+        def on_yscroll(*args):
+            v_scrollbar.set(*args)
+            self.schedule_tile_render()
+        
         self.canvas = Canvas(canvas_frame, bg='gray', 
-                            xscrollcommand=h_scrollbar.set,
-                            yscrollcommand=v_scrollbar.set)
+                            xscrollcommand=on_xscroll,
+                            yscrollcommand=on_yscroll)
         self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.canvas.bind("<Configure>", lambda e: self.schedule_tile_render())
         
         h_scrollbar.config(command=self.canvas.xview)
         v_scrollbar.config(command=self.canvas.yview)
@@ -103,11 +150,9 @@ class SpriteSheetGUI:
         
         tk.Label(preview_frame, text="切割预览：", font=("Arial", 10, "bold")).pack(anchor=tk.W)
         
-        self.preview_container = tk.Frame(preview_frame, bg='white', relief=tk.SUNKEN, bd=1)
-        self.preview_container.pack(fill=tk.BOTH, expand=True, pady=5)
-        
-        self.preview_scroll = tk.Frame(self.preview_container)
-        self.preview_scroll.pack(side=tk.LEFT, fill=tk.X)
+        # 虚拟化缩略图条：可滚动浏览全部精灵，只生成可见部分的缩略图
+        self.thumbnail_strip = ThumbnailStrip(preview_frame, relief=tk.SUNKEN, bd=1)
+        self.thumbnail_strip.pack(fill=tk.BOTH, expand=True, pady=5)
     
     def setup_control_panel(self, parent):
         tk.Label(parent, text="精灵表切割工具", font=("Arial", 14, "bold")).pack(pady=10)
@@ -144,9 +189,21 @@ class SpriteSheetGUI:
         
         ttk.Separator(parent, orient='horizontal').pack(fill=tk.X, pady=10)
         
-        cut_btn = tk.Button(parent, text="执行切割", command=self.execute_cut,
+        cut_btn_frame = tk.Frame(parent)
+        cut_btn_frame.pack(pady=5)
+        
+        cut_btn = tk.Button(cut_btn_frame, text="执行切割", command=self.execute_cut,
                           bg='#2196F3', fg='white', padx=20, pady=5)
-        cut_btn.pack(pady=5)
+        cut_btn.pack(side=tk.LEFT, padx=5)
+        
+        self.cancel_cut_btn = tk.Button(cut_btn_frame, text="取消", command=self.cancel_cut,
+                                        state=tk.DISABLED, padx=10, pady=5)
+        self.cancel_cut_btn.pack(side=tk.LEFT, padx=5)
+        
+        # 相同图片和参数的切割结果会被缓存，再次切割时直接复用
+        self.keep_selection_var = tk.BooleanVar(value=True)
+        tk.Checkbutton(parent, text="复用缓存结果时保留选择", variable=self.keep_selection_var,
+                      command=self.on_keep_selection_change).pack(anchor=tk.W, padx=20)
         
         self.result_label = tk.Label(parent, text="", fg='green')
         self.result_label.pack(pady=5)
@@ -180,6 +237,11 @@ class SpriteSheetGUI:
         self.trim_var = tk.BooleanVar(value=True)
         tk.Checkbutton(parent, text="去除透明边缘", variable=self.trim_var).pack(anchor=tk.W, padx=20)
         
+        # 增量导出写入固定目录，只重新编码有变化的图片
+        self.incremental_export_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(parent, text="增量导出（固定目录，跳过未变化的图片）",
+                      variable=self.incremental_export_var).pack(anchor=tk.W, padx=20)
+        
         # 导出格式选择
         format_frame = tk.Frame(parent)
         format_frame.pack(fill=tk.X, pady=2, padx=20)
@@ -189,6 +251,13 @@ class SpriteSheetGUI:
                                    values=["png", "jpg", "webp"], width=8, state="readonly")
         format_menu.pack(side=tk.LEFT, padx=5)
         
+        compress_frame = tk.Frame(parent)
+        compress_frame.pack(fill=tk.X, pady=2, padx=20)
+        tk.Label(compress_frame, text="PNG压缩级别:").pack(side=tk.LEFT)
+        self.compress_level_var = tk.StringVar(value="6")
+        tk.Spinbox(compress_frame, from_=0, to=9, textvariable=self.compress_level_var,
+                  width=5).pack(side=tk.LEFT, padx=5)
+        
         # 创建参数容器框架
         self.export_params_frame = tk.Frame(parent)
         self.export_params_frame.pack(fill=tk.X, pady=5, padx=20)
@@ -200,6 +269,13 @@ class SpriteSheetGUI:
                              bg='#FF9800', fg='white', padx=20, pady=5)
         export_btn.pack(pady=5)
         
+        self.export_status_label = tk.Label(parent, text="", fg='gray')
+        self.export_status_label.pack(pady=2)
+        
+        # 导出任务状态面板，每个任务一行
+        self.export_jobs_frame = tk.Frame(parent)
+        self.export_jobs_frame.pack(fill=tk.X, padx=10)
+        
         scale_frame = tk.Frame(parent)
         scale_frame.pack(fill=tk.X, pady=10)
         tk.Label(scale_frame, text="缩放:").pack(side=tk.LEFT)
@@ -249,6 +325,9 @@ class SpriteSheetGUI:
         tk.Label(offset_frame2, text="Y偏移:").pack(side=tk.LEFT)
         self.offset_y_var = tk.StringVar(value="0")
         tk.Entry(offset_frame2, textvariable=self.offset_y_var, width=10).pack(side=tk.LEFT)
+        
+        self.watch_grid_params([self.cell_width_var, self.cell_height_var, self.padding_x_var,
+                                self.padding_y_var, self.offset_x_var, self.offset_y_var])
     
     def setup_grid_count_params(self):
         for widget in self.params_frame.winfo_children():
@@ -279,6 +358,106 @@ class SpriteSheetGUI:
         tk.Label(padding_frame2, text="垂直间距:").pack(side=tk.LEFT)
         self.padding_y_var = tk.StringVar(value="0")
         tk.Entry(padding_frame2, textvariable=self.padding_y_var, width=10).pack(side=tk.LEFT)
+        
+        self.watch_grid_params([self.rows_var, self.cols_var, self.padding_x_var, self.padding_y_var])
+    
+    def watch_grid_params(self, variables):
+        for var in variables:
+            var.trace_add('write', lambda *args: self.schedule_grid_preview())
+        self.schedule_grid_preview()
+    
+    def schedule_grid_preview(self):
+        if self.grid_preview_after is not None:
+            self.root.after_cancel(self.grid_preview_after)
+        self.grid_preview_after = self.root.after(150, self.update_grid_preview)
+    
+    def update_grid_preview(self):
+        """按当前网格参数重算单元格布局并绘制预览，参数无效或非网格模式时清除预览"""
+        self.grid_preview_after = None
+        self.grid_preview = None
+        mode = self.cut_mode.get()
+        
+        if self.current_image and mode in ("grid_size", "grid_count"):
+            try:
+                if mode == "grid_size":
+                    self.grid_preview = self.cutter.grid_layout(
+                        int(self.cell_width_var.get()),
+                        int(self.cell_height_var.get()),
+                        int(self.padding_x_var.get()),
+                        int(self.padding_y_var.get()),
+                        int(self.offset_x_var.get()),
+                        int(self.offset_y_var.get())
+                    )
+                else:
+                    padding_x = int(self.padding_x_var.get())
+                    padding_y = int(self.padding_y_var.get())
+                    cell_width, cell_height = self.cutter.grid_cell_size(
+                        int(self.rows_var.get()), int(self.cols_var.get()), padding_x, padding_y
+                    )
+                    self.grid_preview = self.cutter.grid_layout(cell_width, cell_height,
+                                                                padding_x, padding_y)
+            except ValueError:
+                self.grid_preview = None
+        
+        self.draw_grid_preview()
+        if self.grid_preview is not None:
+            self.result_label.config(
+                text=f"预览: {self.grid_preview.cell_count} 个单元格, "
+                     f"{self.grid_preview.occupied_count} 个非空",
+                fg='gray'
+            )
+    
+    def clear_grid_preview(self):
+        if self.grid_preview_after is not None:
+            self.root.after_cancel(self.grid_preview_after)
+            self.grid_preview_after = None
+        self.grid_preview = None
+        self.canvas.delete("grid_preview")
+    
+    def draw_grid_preview(self):
+        """绘制可见范围内的网格预览：非空单元格为青色实线，空单元格为灰色虚线"""
+        self.canvas.delete("grid_preview")
+        layout = self.grid_preview
+        if layout is None or not layout.cell_count:
+            return
+        
+        scale = self.scale_factor
+        view_x1 = self.canvas.canvasx(0) / scale
+        view_y1 = self.canvas.canvasy(0) / scale
+        view_x2 = self.canvas.canvasx(self.canvas.winfo_width()) / scale
+        view_y2 = self.canvas.canvasy(self.canvas.winfo_height()) / scale
+        
+        cols = np.flatnonzero((layout.xs + layout.cell_width >= view_x1) & (layout.xs <= view_x2))
+        rows = np.flatnonzero((layout.ys + layout.cell_height >= view_y1) & (layout.ys <= view_y2))
+        if not len(cols) or not len(rows):
+            return
+        
+        if len(cols) * len(rows) > self.overlay_item_limit:
+            # 单元格太多时只画网格线，不区分空单元格
+            top = layout.ys[rows[0]] * scale
+            bottom = (layout.ys[rows[-1]] + layout.cell_height) * scale
+            left = layout.xs[cols[0]] * scale
+            right = (layout.xs[cols[-1]] + layout.cell_width) * scale
+            for x in np.concatenate([layout.xs[cols], layout.xs[cols] + layout.cell_width]).tolist():
+                self.canvas.create_line(x * scale, top, x * scale, bottom,
+                                        fill='cyan', tags="grid_preview")
+            for y in np.concatenate([layout.ys[rows], layout.ys[rows] + layout.cell_height]).tolist():
+                self.canvas.create_line(left, y * scale, right, y * scale,
+                                        fill='cyan', tags="grid_preview")
+            return
+        
+        for row in rows.tolist():
+            y = int(layout.ys[row])
+            for col in cols.tolist():
+                x = int(layout.xs[col])
+                occupied = layout.occupied[row, col]
+                self.canvas.create_rectangle(
+                    x * scale, y * scale,
+                    (x + layout.cell_width) * scale, (y + layout.cell_height) * scale,
+                    outline='cyan' if occupied else '#777777',
+                    dash=() if occupied else (2, 4),
+                    tags="grid_preview"
+                )
     
     def setup_auto_params(self):
         for widget in self.params_frame.winfo_children():
@@ -297,6 +476,19 @@ class SpriteSheetGUI:
         tk.Label(threshold_frame, text="透明度阈值:").pack(side=tk.LEFT)
         self.threshold_var = tk.StringVar(value="10")
         tk.Entry(threshold_frame, textvariable=self.threshold_var, width=10).pack(side=tk.LEFT)
+        
+        engine_frame = tk.Frame(self.params_frame)
+        engine_frame.pack(fill=tk.X, pady=2)
+        tk.Label(engine_frame, text="检测方式:").pack(side=tk.LEFT)
+        self.auto_engine_var = tk.StringVar(value="contours")
+        ttk.Combobox(engine_frame, textvariable=self.auto_engine_var,
+                    values=["contours", "components"], width=10, state="readonly").pack(side=tk.LEFT)
+        
+        gap_frame = tk.Frame(self.params_frame)
+        gap_frame.pack(fill=tk.X, pady=2)
+        tk.Label(gap_frame, text="碎片合并间距:").pack(side=tk.LEFT)
+        self.merge_gap_var = tk.StringVar(value="0")
+        tk.Entry(gap_frame, textvariable=self.merge_gap_var, width=10).pack(side=tk.LEFT)
     
     def setup_manual_params(self):
         for widget in self.params_frame.winfo_children():
@@ -326,6 +518,9 @@ class SpriteSheetGUI:
             self.setup_manual_params()
             self.manual_selections = []
             self.redraw_canvas()
+        
+        if mode not in ("grid_size", "grid_count"):
+            self.clear_grid_preview()
     
     def load_image(self):
         file_path = filedialog.askopenfilename(
@@ -335,33 +530,129 @@ class SpriteSheetGUI:
         
         if file_path:
             try:
+                self.cancel_cut()
                 self.current_image = self.cutter.load_image(file_path)
                 self.image_info_label.config(
                     text=f"图片: {os.path.basename(file_path)}\n尺寸: {self.current_image.width} x {self.current_image.height}",
                     fg='black'
                 )
-                self.display_image_on_canvas()
-                self.sprites = []
+                self.sprites = self.cutter.sprites
                 self.manual_selections = []
+                self.display_image_on_canvas()
+                self.redraw_canvas()
+                self.schedule_grid_preview()
                 self.clear_preview()
             except Exception as e:
                 messagebox.showerror("错误", f"无法加载图片: {str(e)}")
     
+    @tracing.traced()
     def display_image_on_canvas(self):
         if not self.current_image:
             return
         
-        display_width = int(self.current_image.width * self.scale_factor)
-        display_height = int(self.current_image.height * self.scale_factor)
+        if self.tile_pyramid is None or self.tile_pyramid.image is not self.current_image:
+            self.tile_pyramid = TilePyramid(self.current_image)
+            self.tile_cache.clear()
         
-        resized = self.current_image.resize((display_width, display_height), Image.Resampling.NEAREST)
-        self.display_image = ImageTk.PhotoImage(resized)
+        display_width, display_height = self.tile_pyramid.display_size(self.scale_factor)
         
-        self.canvas.delete("all")
-        self.canvas_image_id = self.canvas.create_image(0, 0, anchor=tk.NW, image=self.display_image)
-        self.canvas.config(scrollregion=self.canvas.bbox("all"))
+        self.canvas.delete("tile")
+        self.tile_items = {}
+        self.canvas.config(scrollregion=(0, 0, display_width, display_height))
         
-        self.redraw_canvas()
+        # 覆盖层随缩放整体变换，不重建
+        if self.scale_factor != self.overlay_scale:
+            factor = self.scale_factor / self.overlay_scale
+            self.canvas.scale("overlay", 0, 0, factor, factor)
+            self.overlay_scale = self.scale_factor
+        
+        self.render_visible_tiles()
+    
+    def schedule_tile_render(self):
+        if self.tile_pyramid is not None and not self.tile_render_pending:
+            self.tile_render_pending = True
+            self.root.after_idle(self.render_visible_tiles)
+    
+    def render_visible_tiles(self):
+        """创建与可见区域（外加一圈预取）相交的分块，移除移出视野的分块"""
+        self.tile_render_pending = False
+        if self.tile_pyramid is None:
+            return
+        
+        scale = self.scale_factor
+        tile_size = self.tile_pyramid.tile_size
+        x1 = self.canvas.canvasx(0)
+        y1 = self.canvas.canvasy(0)
+        x2 = self.canvas.canvasx(self.canvas.winfo_width())
+        y2 = self.canvas.canvasy(self.canvas.winfo_height())
+        visible = set(self.tile_pyramid.visible_tiles(scale, x1, y1, x2, y2, margin=1))
+        
+        for key in list(self.tile_items):
+            if key not in visible:
+                item_id, _ = self.tile_items.pop(key)
+                self.canvas.delete(item_id)
+        
+        for tx, ty in visible:
+            if (tx, ty) in self.tile_items:
+                continue
+            photo = self.tile_cache.get((scale, tx, ty))
+            if photo is None:
+                tile = self.tile_pyramid.tile(scale, tx, ty)
+                if self.overlay_rasterized:
+                    self.draw_tile_overlays(tile, tx, ty)
+                photo = ImageTk.PhotoImage(tile)
+                self.tile_cache.put((scale, tx, ty), photo)
+            item_id = self.canvas.create_image(tx * tile_size, ty * tile_size, anchor=tk.NW,
+                                               image=photo, tags="tile")
+            # 分块始终在精灵边框等覆盖层之下；显示中的 PhotoImage 由 tile_items 持有，不会被缓存淘汰释放
+            self.canvas.tag_lower(item_id)
+            self.tile_items[(tx, ty)] = (item_id, photo)
+        
+        # 网格预览只画可见部分，视野变化时跟着重画
+        if self.grid_preview is not None:
+            self.draw_grid_preview()
+    
+    def draw_tile_overlays(self, tile, tx, ty):
+        """把与分块相交的精灵边框直接画进分块图像（精灵过多时使用）"""
+        scale = self.scale_factor
+        left = tx * self.tile_pyramid.tile_size
+        top = ty * self.tile_pyramid.tile_size
+        indices = self.cutter.get_sprite_index().query_rect(
+            left / scale, top / scale, (left + tile.width) / scale, (top + tile.height) / scale
+        )
+        draw = ImageDraw.Draw(tile)
+        for i in indices:
+            sprite = self.sprites[i]
+            color, width = self.sprite_outline(sprite)
+            x1, y1, x2, y2 = self.sprite_box(sprite, scale)
+            draw.rectangle((x1 - left, y1 - top, x2 - left, y2 - top), outline=color, width=width)
+    
+    def invalidate_tiles(self, indices=None):
+        """丢弃包含指定精灵（None 为全部）的分块缓存并重新生成可见分块"""
+        if indices is None:
+            self.tile_cache.clear()
+            stale = list(self.tile_items)
+        else:
+            scale = self.scale_factor
+            stale = set()
+            for i in indices:
+                sprite = self.sprites[i]
+                # 边框线宽可能越过精灵边界几个像素
+                for key in self.tile_pyramid.visible_tiles(
+                        scale, sprite.x * scale - 3, sprite.y * scale - 3,
+                        (sprite.x + sprite.width) * scale + 3, (sprite.y + sprite.height) * scale + 3):
+                    stale.add(key)
+            for tx, ty in stale:
+                self.tile_cache.pop((scale, tx, ty))
+            # 其它缩放级别的分块无法逐个判断，整体丢弃
+            for key in list(self.tile_cache.items):
+                if key[0] != scale:
+                    self.tile_cache.pop(key)
+        
+        for key in stale:
+            if key in self.tile_items:
+                self.canvas.delete(self.tile_items.pop(key)[0])
+        self.render_visible_tiles()
     
     def on_scale_change(self, value):
         self.scale_factor = float(value)
@@ -373,12 +664,9 @@ class SpriteSheetGUI:
         canvas_y = self.canvas.canvasy(event.y)
         
         if self.sprites and self.cut_mode.get() != "manual":
-            clicked_sprite = self.find_sprite_at_position(canvas_x, canvas_y)
-            if clicked_sprite:
-                clicked_sprite.selected = not clicked_sprite.selected
-                self.update_selection_count()
-                self.redraw_canvas()
-                return
+            # 松开时判断：没有拖动则切换点中的精灵，否则框选
+            self.band_start = (canvas_x, canvas_y)
+            return
         
         if self.cut_mode.get() == "manual" and self.current_image:
             self.selection_start = (canvas_x, canvas_y)
@@ -392,6 +680,18 @@ class SpriteSheetGUI:
             )
     
     def on_canvas_drag(self, event):
+        if self.band_start:
+            canvas_x = self.canvas.canvasx(event.x)
+            canvas_y = self.canvas.canvasy(event.y)
+            if self.band_rect:
+                self.canvas.coords(self.band_rect, *self.band_start, canvas_x, canvas_y)
+            else:
+                self.band_rect = self.canvas.create_rectangle(
+                    *self.band_start, canvas_x, canvas_y,
+                    outline='orange', width=1, dash=(4, 4), tags="rubber_band"
+                )
+            return
+        
         if self.cut_mode.get() == "manual" and self.selection_start and self.current_selection:
             canvas_x = self.canvas.canvasx(event.x)
             canvas_y = self.canvas.canvasy(event.y)
@@ -401,6 +701,32 @@ class SpriteSheetGUI:
                              canvas_x, canvas_y)
     
     def on_canvas_release(self, event):
+        if self.band_start:
+            canvas_x = self.canvas.canvasx(event.x)
+            canvas_y = self.canvas.canvasy(event.y)
+            start_x, start_y = self.band_start
+            self.band_start = None
+            if self.band_rect:
+                self.canvas.delete(self.band_rect)
+                self.band_rect = None
+            
+            if abs(canvas_x - start_x) < 4 and abs(canvas_y - start_y) < 4:
+                index = self.find_sprite_index_at_position(canvas_x, canvas_y)
+                if index is None:
+                    return
+                self.sprites[index].selected = not self.sprites[index].selected
+                changed = [index]
+            else:
+                # 框选：选中框内相交的精灵，按住Ctrl则取消选中
+                deselect = bool(event.state & 0x0004)
+                changed = self.find_sprite_indices_in_rect(start_x, start_y, canvas_x, canvas_y)
+                for i in changed:
+                    self.sprites[i].selected = not deselect
+            
+            self.update_selection_count()
+            self.refresh_sprite_overlays(changed)
+            return
+        
         if self.cut_mode.get() == "manual" and self.selection_start and self.current_selection:
             canvas_x = self.canvas.canvasx(event.x)
             canvas_y = self.canvas.canvasy(event.y)
@@ -420,7 +746,7 @@ class SpriteSheetGUI:
                 rect_id = self.canvas.create_rectangle(
                     x1 * self.scale_factor, y1 * self.scale_factor,
                     x2 * self.scale_factor, y2 * self.scale_factor,
-                    outline='green', width=2, tags="selection"
+                    outline='green', width=2, tags=("selection", "overlay")
                 )
             
             self.canvas.delete(self.current_selection)
@@ -439,32 +765,64 @@ class SpriteSheetGUI:
             self.selection_count_label.config(text=f"已选择: {len(self.manual_selections)} 个区域")
     
     def redraw_canvas(self):
+        """重建全部覆盖层：手动框选区域和精灵边框，精灵列表变化后调用"""
         self.canvas.delete("selection")
         self.canvas.delete("sprite_rect")
-        self.sprite_rectangles.clear()
+        self.sprite_items = []
+        self.overlay_scale = self.scale_factor
         
         for x, y, w, h in self.manual_selections:
             self.canvas.create_rectangle(
                 x * self.scale_factor, y * self.scale_factor,
                 (x + w) * self.scale_factor, (y + h) * self.scale_factor,
-                outline='green', width=2, tags="selection"
+                outline='green', width=2, tags=("selection", "overlay")
             )
         
+        rasterized = len(self.sprites) > self.overlay_item_limit
+        if rasterized or self.overlay_rasterized:
+            self.overlay_rasterized = rasterized
+            if self.tile_pyramid is not None:
+                self.invalidate_tiles()
+        if rasterized:
+            return
+        
         for sprite in self.sprites:
-            x1 = sprite.x * self.scale_factor
-            y1 = sprite.y * self.scale_factor
-            x2 = (sprite.x + sprite.width) * self.scale_factor
-            y2 = (sprite.y + sprite.height) * self.scale_factor
-            
-            color = 'red' if sprite.selected else 'blue'
-            width = 3 if sprite.selected else 1
-            
-            rect_id = self.canvas.create_rectangle(
-                x1, y1, x2, y2,
-                outline=color, width=width, tags="sprite_rect"
-            )
-            self.sprite_rectangles[rect_id] = sprite
+            color, width = self.sprite_outline(sprite)
+            self.sprite_items.append(self.canvas.create_rectangle(
+                *self.sprite_box(sprite, self.scale_factor),
+                outline=color, width=width, tags=("sprite_rect", "overlay")
+            ))
+    
+    def refresh_sprite_overlays(self, indices=None):
+        """选中状态变化后只更新受影响精灵的边框，indices 为 None 表示全部"""
+        if self.overlay_rasterized:
+            self.invalidate_tiles(indices)
+            return
+        
+        if indices is None:
+            states = {s.selected for s in self.sprites}
+            if len(states) == 1:
+                # 全部同一状态时一次配置所有边框
+                color, width = self.sprite_outline(self.sprites[0])
+                self.canvas.itemconfig("sprite_rect", outline=color, width=width)
+                return
+            indices = range(len(self.sprites))
+        
+        for i in indices:
+            color, width = self.sprite_outline(self.sprites[i])
+            self.canvas.itemconfig(self.sprite_items[i], outline=color, width=width)
+    
+    @staticmethod
+    def sprite_outline(sprite):
+        return ('red', 3) if sprite.selected else ('blue', 1)
     
+    @staticmethod
+    def sprite_box(sprite, scale):
+        """精灵边框的坐标，右下角向内收1像素，相邻精灵的边框不重叠，1像素的间隙也保持可见"""
+        return (sprite.x * scale, sprite.y * scale,
+                (sprite.x + sprite.width) * scale - 1, (sprite.y + sprite.height) * scale - 1)
+    
+    @tracing.traced()
     def execute_cut(self):
         if not self.current_image:
             messagebox.showwarning("警告", "请先加载图片")
@@ -474,7 +832,8 @@ class SpriteSheetGUI:
             mode = self.cut_mode.get()
             
             if mode == "grid_size":
-                self.sprites = self.cutter.grid_cut_by_size(
+                method = 'grid_cut_by_size'
+                args = (
                     int(self.cell_width_var.get()),
                     int(self.cell_height_var.get()),
                     int(self.padding_x_var.get()),
@@ -483,74 +842,132 @@ class SpriteSheetGUI:
                     int(self.offset_y_var.get())
                 )
             elif mode == "grid_count":
-                self.sprites = self.cutter.grid_cut_by_count(
+                method = 'grid_cut_by_count'
+                args = (
                     int(self.rows_var.get()),
                     int(self.cols_var.get()),
                     int(self.padding_x_var.get()),
                     int(self.padding_y_var.get())
                 )
             elif mode == "auto":
-                self.sprites = self.cutter.auto_cut(
+                method = 'auto_cut'
+                args = (
                     int(self.min_size_var.get()),
-                    int(self.threshold_var.get())
+                    int(self.threshold_var.get()),
+                    self.auto_engine_var.get(),
+                    int(self.merge_gap_var.get())
                 )
             elif mode == "manual":
                 if not self.manual_selections:
                     messagebox.showwarning("警告", "请先框选精灵区域")
                     return
-                self.sprites = self.cutter.manual_cut(self.manual_selections)
-            
-            self.result_label.config(text=f"成功切割 {len(self.sprites)} 个精灵")
-            self.selected_count = 0
-            self.update_selection_count()
-            self.redraw_canvas()
-            self.show_preview()
-            
+                method = 'manual_cut'
+                args = (list(self.manual_selections),)
         except ValueError as e:
             messagebox.showerror("错误", f"参数错误: {str(e)}")
+            return
+        
+        # 新任务取代仍在运行的旧任务
+        self.cancel_cut()
+        self.cut_job_id += 1
+        self.cut_cancel_event = threading.Event()
+        
+        # 后台线程只操作快照：共享只读像素，结果写入快照自己的精灵列表
+        worker = threading.Thread(
+            target=self.run_cut_job,
+            args=(self.cut_job_id, self.cutter.snapshot(), method, args, self.cut_cancel_event),
+            daemon=True
+        )
+        worker.start()
+        
+        self.cancel_cut_btn.config(state=tk.NORMAL)
+        self.result_label.config(text="切割中...", fg='gray')
+        if not self.cut_polling:
+            self.cut_polling = True
+            self.root.after(50, self.poll_cut_events)
+    
+    def run_cut_job(self, job_id, cutter, method, args, cancel_event):
+        """在工作线程中执行切割，不访问任何Tk对象，只通过队列回传事件"""
+        def progress(done, total):
+            if cancel_event.is_set():
+                raise CutCancelled()
+            self.cut_events.put((job_id, 'progress', (done, total)))
+        
+        try:
+            sprites = getattr(cutter, method)(*args, progress_callback=progress)
+            self.cut_events.put((job_id, 'done', (cutter, sprites)))
+        except CutCancelled:
+            self.cut_events.put((job_id, 'cancelled', None))
+        except ValueError as e:
+            self.cut_events.put((job_id, 'error', f"参数错误: {str(e)}"))
         except Exception as e:
-            messagebox.showerror("错误", f"切割失败: {str(e)}")
+            self.cut_events.put((job_id, 'error', f"切割失败: {str(e)}"))
     
-    def show_preview(self):
-        self.clear_preview()
+    def poll_cut_events(self):
+        finished = False
+        while True:
+            try:
+                job_id, kind, payload = self.cut_events.get_nowait()
+            except queue.Empty:
+                break
+            # 已被取代的任务的事件直接丢弃
+            if job_id != self.cut_job_id:
+                continue
+            
+            if kind == 'progress':
+                done, total = payload
+                # total 为 0 时处于哈希、连通域分析等尚不知道精灵数的阶段
+                text = f"切割中... {done}/{total}" if total else "切割中..."
+                self.result_label.config(text=text, fg='gray')
+                continue
+            
+            finished = True
+            self.cut_cancel_event = None
+            self.cancel_cut_btn.config(state=tk.DISABLED)
+            if kind == 'done':
+                self.apply_cut_result(*payload)
+            elif kind == 'cancelled':
+                self.result_label.config(text="切割已取消", fg='gray')
+            else:
+                self.result_label.config(text="", fg='green')
+                messagebox.showerror("错误", payload)
         
-        if not self.sprites:
+        self.cut_polling = not finished and self.cut_cancel_event is not None
+        if self.cut_polling:
+            self.root.after(50, self.poll_cut_events)
+    
+    def apply_cut_result(self, cutter, sprites):
+        # 切割期间换了图片，结果已经无效
+        if cutter.pixels is not self.cutter.pixels:
+            self.result_label.config(text="", fg='green')
             return
         
-        max_previews = 10
-        sprites_to_show = self.sprites[:max_previews]
-        
-        for i, sprite in enumerate(sprites_to_show):
-            if sprite.image:
-                thumb_size = (80, 80)
-                thumbnail = sprite.image.copy()
-                thumbnail.thumbnail(thumb_size, Image.Resampling.LANCZOS)
-                
-                photo = ImageTk.PhotoImage(thumbnail)
-                
-                frame = tk.Frame(self.preview_scroll, relief=tk.RAISED, bd=1)
-                frame.pack(side=tk.LEFT, padx=2, pady=2)
-                
-                label = tk.Label(frame, image=photo)
-                label.image = photo
-                label.pack()
-                
-                info_label = tk.Label(frame, text=f"{sprite.name}\n{sprite.width}x{sprite.height}",
-                                    font=("Arial", 8))
-                info_label.pack()
-                
-                self.preview_labels.append(label)
+        # 带回后台线程算好的内容哈希，之后的快照不必重新计算
+        if self.cutter.content_hash is None:
+            self.cutter.content_hash = cutter.content_hash
         
-        if len(self.sprites) > max_previews:
-            more_label = tk.Label(self.preview_scroll, 
-                                text=f"... 还有 {len(self.sprites) - max_previews} 个",
-                                font=("Arial", 10), fg='gray')
-            more_label.pack(side=tk.LEFT, padx=10)
+        # 真正切割完成后网格预览不再需要
+        self.clear_grid_preview()
+        self.cutter.sprites = sprites
+        self.sprites = sprites
+        self.result_label.config(text=f"成功切割 {len(self.sprites)} 个精灵", fg='green')
+        self.selected_count = 0
+        self.update_selection_count()
+        self.redraw_canvas()
+        self.show_preview()
+    
+    def on_keep_selection_change(self):
+        self.cutter.keep_cached_selection = self.keep_selection_var.get()
+    
+    def cancel_cut(self):
+        if self.cut_cancel_event is not None:
+            self.cut_cancel_event.set()
+    
+    def show_preview(self):
+        self.thumbnail_strip.set_sprites(self.sprites, self.cutter.pixels)
     
     def clear_preview(self):
-        for widget in self.preview_scroll.winfo_children():
-            widget.destroy()
-        self.preview_labels = []
+        self.thumbnail_strip.clear()
     
     def on_export_mode_change(self):
         mode = self.export_mode.get()
@@ -596,13 +1013,36 @@ class SpriteSheetGUI:
         tk.Entry(size_frame, textvariable=self.max_atlas_width_var, width=8).pack(side=tk.LEFT)
         tk.Label(size_frame, text="像素").pack(side=tk.LEFT)
         
+        size_frame2 = tk.Frame(self.export_params_frame)
+        size_frame2.pack(fill=tk.X, pady=2)
+        tk.Label(size_frame2, text="最大高度:").pack(side=tk.LEFT)
+        self.max_atlas_height_var = tk.StringVar(value="0")
+        tk.Entry(size_frame2, textvariable=self.max_atlas_height_var, width=8).pack(side=tk.LEFT)
+        tk.Label(size_frame2, text="像素 (0为不限)").pack(side=tk.LEFT)
+        
         # 排列算法选择
         algo_frame = tk.Frame(self.export_params_frame)
         algo_frame.pack(fill=tk.X, pady=2)
         tk.Label(algo_frame, text="排列方式:").pack(side=tk.LEFT)
-        self.pack_algorithm_var = tk.StringVar(value="row")
+        self.pack_algorithm_var = tk.StringVar(value="skyline")
         ttk.Combobox(algo_frame, textvariable=self.pack_algorithm_var,
-                    values=["row", "square", "tight"], width=10, state="readonly").pack(side=tk.LEFT)
+                    values=["skyline", "maxrects", "shelf"], width=10, state="readonly").pack(side=tk.LEFT)
+        
+        # 尺寸约束
+        self.power_of_two_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(self.export_params_frame, text="尺寸为2的幂",
+                      variable=self.power_of_two_var).pack(anchor=tk.W)
+        self.square_atlas_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(self.export_params_frame, text="正方形图集",
+                      variable=self.square_atlas_var).pack(anchor=tk.W)
+        
+        # 重复帧合并
+        dedupe_frame = tk.Frame(self.export_params_frame)
+        dedupe_frame.pack(fill=tk.X, pady=2)
+        tk.Label(dedupe_frame, text="重复帧:").pack(side=tk.LEFT)
+        self.dedupe_var = tk.StringVar(value="exact")
+        ttk.Combobox(dedupe_frame, textvariable=self.dedupe_var,
+                    values=["none", "exact", "transform"], width=10, state="readonly").pack(side=tk.LEFT)
         
         # 图集文件名
         name_frame = tk.Frame(self.export_params_frame)
@@ -612,14 +1052,17 @@ class SpriteSheetGUI:
         tk.Entry(name_frame, textvariable=self.atlas_name_var, width=15).pack(side=tk.LEFT)
     
     def find_sprite_at_position(self, x, y):
-        real_x = x / self.scale_factor
-        real_y = y / self.scale_factor
-        
-        for sprite in self.sprites:
-            if (sprite.x <= real_x <= sprite.x + sprite.width and 
-                sprite.y <= real_y <= sprite.y + sprite.height):
-                return sprite
-        return None
+        index = self.find_sprite_index_at_position(x, y)
+        return self.sprites[index] if index is not None else None
+    
+    def find_sprite_index_at_position(self, x, y):
+        return self.cutter.get_sprite_index().query_point(x / self.scale_factor, y / self.scale_factor)
+    
+    def find_sprite_indices_in_rect(self, x1, y1, x2, y2):
+        return self.cutter.get_sprite_index().query_rect(
+            x1 / self.scale_factor, y1 / self.scale_factor,
+            x2 / self.scale_factor, y2 / self.scale_factor
+        ).tolist()
     
     def update_selection_count(self):
         self.selected_count = sum(1 for s in self.sprites if s.selected)
@@ -635,27 +1078,29 @@ class SpriteSheetGUI:
         for sprite in self.sprites:
             sprite.selected = True
         self.update_selection_count()
-        self.redraw_canvas()
+        self.refresh_sprite_overlays()
     
     def deselect_all_sprites(self):
         for sprite in self.sprites:
             sprite.selected = False
         self.update_selection_count()
-        self.redraw_canvas()
+        self.refresh_sprite_overlays()
     
     def invert_selection(self):
         for sprite in self.sprites:
             sprite.selected = not sprite.selected
         self.update_selection_count()
-        self.redraw_canvas()
+        self.refresh_sprite_overlays()
     
+    @tracing.traced()
     def export_selected_sprites(self):
+        """按当前设置和选择创建导出任务并加入队列，不阻塞界面"""
         if not self.sprites:
             messagebox.showwarning("警告", "没有可导出的精灵")
             return
         
-        selected_count = sum(1 for s in self.sprites if s.selected)
-        if selected_count == 0:
+        selected_sprites = [s for s in self.sprites if s.selected]
+        if not selected_sprites:
             messagebox.showwarning("警告", "请先选择要导出的精灵")
             return
         
@@ -669,6 +1114,14 @@ class SpriteSheetGUI:
                     self.setup_atlas_export_params()
                 atlas_padding = int(self.atlas_padding_var.get())
                 atlas_name = self.atlas_name_var.get() if hasattr(self, 'atlas_name_var') else 'atlas'
+                pack_options = {
+                    'pack_strategy': self.pack_algorithm_var.get(),
+                    'max_atlas_width': int(self.max_atlas_width_var.get()),
+                    'max_atlas_height': int(self.max_atlas_height_var.get()),
+                    'power_of_two': self.power_of_two_var.get(),
+                    'square': self.square_atlas_var.get(),
+                    'dedupe': self.dedupe_var.get()
+                }
                 name_prefix = 'sprite_'
                 export_name = atlas_name
             else:
@@ -676,56 +1129,201 @@ class SpriteSheetGUI:
                     self.setup_individual_export_params()
                 atlas_padding = 2
                 atlas_name = 'atlas'
+                pack_options = {}
                 name_prefix = self.name_prefix_var.get() if hasattr(self, 'name_prefix_var') else 'sprite_'
                 export_name = name_prefix.rstrip('_')  # 移除末尾的下划线作为文件夹名
             
-            # 创建输出目录：output/导出名称_时间戳
-            import time
-            timestamp = time.strftime("%Y%m%d_%H%M%S")
-            folder_name = f"{export_name}_{timestamp}"
-            
-            # 获取项目根目录并创建output子文件夹
-            project_dir = os.path.dirname(os.path.abspath(__file__))
-            output_base = os.path.join(project_dir, 'output')
-            os.makedirs(output_base, exist_ok=True)
-            
-            output_dir = os.path.join(output_base, folder_name)
-            os.makedirs(output_dir, exist_ok=True)
-            
-            metadata = self.cutter.export_selected_sprites(
-                output_dir,
+            options = dict(
                 format=format,
                 trim=self.trim_var.get(),
                 mode=mode,
                 atlas_padding=atlas_padding,
                 atlas_name=atlas_name,
-                name_prefix=name_prefix
+                name_prefix=name_prefix,
+                compress_level=int(self.compress_level_var.get()),
+                incremental=self.incremental_export_var.get(),
+                **pack_options
             )
+        except ValueError as e:
+            messagebox.showerror("错误", f"参数错误: {str(e)}")
+            return
+        
+        # 创建输出目录：output/导出名称_时间戳，增量导出时固定为 output/导出名称
+        self.export_job_counter += 1
+        if options['incremental']:
+            folder_name = export_name
+        else:
+            import time
+            timestamp = time.strftime("%Y%m%d_%H%M%S")
+            folder_name = f"{export_name}_{timestamp}"
+        
+        # 获取项目根目录下的output子文件夹
+        project_dir = os.path.dirname(os.path.abspath(__file__))
+        output_dir = os.path.join(project_dir, 'output', folder_name)
+        # 同一秒内排队的多个任务不能写到同一目录
+        if not options['incremental'] and (os.path.exists(output_dir) or
+                                           any(j['output_dir'] == output_dir for j in self.export_jobs)):
+            folder_name = f"{folder_name}_{self.export_job_counter}"
+            output_dir = os.path.join(project_dir, 'output', folder_name)
+        
+        job = {
+            'id': self.export_job_counter,
+            'title': f"#{self.export_job_counter} {'图集' if mode == 'atlas' else '单图'} {export_name}",
+            'cutter': self.cutter.snapshot(),
+            'sprites': selected_sprites,
+            'output_dir': output_dir,
+            'relative_path': os.path.join('output', folder_name),
+            'options': options,
+            'status': 'queued',
+            'metadata': None
+        }
+        self.add_export_job_row(job)
+        self.export_jobs.append(job)
+        self.export_queue.put(job)
+        
+        if self.export_worker is None:
+            self.export_worker = threading.Thread(target=self.run_export_worker, daemon=True)
+            self.export_worker.start()
+        if not self.export_polling:
+            self.export_polling = True
+            self.root.after(100, self.poll_export_events)
+        self.update_export_status()
+    
+    def run_export_worker(self):
+        """导出工作线程：依次执行队列中的任务，只通过事件队列与界面通信"""
+        import time
+        while True:
+            job = self.export_queue.get()
+            job_id = job['id']
+            start = time.monotonic()
+            self.export_events.put((job_id, 'start', start))
             
-            # 相对路径显示
-            relative_path = os.path.join('output', folder_name)
+            def progress(done, total, bytes_written):
+                self.export_events.put((job_id, 'progress', (done, total, bytes_written, time.monotonic())))
             
-            if mode == 'individual':
-                messagebox.showinfo("导出成功", 
-                                  f"✅ 成功导出 {metadata['sprite_count']} 个精灵\n\n"
-                                  f"📁 保存位置: {relative_path}\n"
-                                  f"📊 统计信息:\n"
-                                  f"  • 图片数量: {metadata['statistics']['total_images']}\n"
-                                  f"  • 尺寸范围: {metadata['statistics']['min_width']}~{metadata['statistics']['max_width']} × "
-                                  f"{metadata['statistics']['min_height']}~{metadata['statistics']['max_height']}")
-            else:
-                atlas_size = metadata['atlas_size']
-                layout = metadata['layout_info']
-                messagebox.showinfo("导出成功", 
-                                  f"✅ 成功导出图集\n\n"
-                                  f"📁 保存位置: {relative_path}\n"
-                                  f"📊 图集信息:\n"
-                                  f"  • 图集尺寸: {atlas_size['width']}×{atlas_size['height']}\n"
-                                  f"  • 精灵数量: {metadata['sprite_count']}\n"
-                                  f"  • 估算布局: {layout['estimated_columns']}列 × {layout['estimated_rows']}行\n"
-                                  f"  • 精灵间距: {metadata['sprite_padding']}像素")
-        except Exception as e:
-            messagebox.showerror("错误", f"导出失败: {str(e)}")
+            try:
+                os.makedirs(job['output_dir'], exist_ok=True)
+                metadata = job['cutter'].export_selected_sprites(
+                    job['output_dir'],
+                    sprites=job['sprites'],
+                    progress_callback=progress,
+                    **job['options']
+                )
+                self.export_events.put((job_id, 'done', metadata))
+            except Exception as e:
+                self.export_events.put((job_id, 'error', str(e)))
+    
+    def poll_export_events(self):
+        jobs = {job['id']: job for job in self.export_jobs}
+        while True:
+            try:
+                job_id, kind, payload = self.export_events.get_nowait()
+            except queue.Empty:
+                break
+            job = jobs.get(job_id)
+            if job is None:
+                continue
+            
+            if kind == 'start':
+                job['status'] = 'running'
+                job['started'] = payload
+                job['status_label'].config(text="准备中（裁剪/打包）...", fg='gray')
+            elif kind == 'progress':
+                # 一次轮询中只显示最新进度
+                job['progress'] = payload
+            elif kind == 'done':
+                job['status'] = 'done'
+                job['metadata'] = payload
+                job['status_label'].config(
+                    text=f"✅ 已导出 {payload['sprite_count']} 个精灵 → {job['relative_path']}", fg='green'
+                )
+                job['detail_button'].config(state=tk.NORMAL)
+            elif kind == 'error':
+                job['status'] = 'error'
+                job['status_label'].config(text=f"❌ 导出失败: {payload}", fg='red')
+            
+            # 任务结束后释放快照，避免长期持有精灵列表
+            if kind in ('done', 'error'):
+                job['cutter'] = None
+                job['sprites'] = None
+        
+        for job in self.export_jobs:
+            if job['status'] == 'running' and job.get('progress'):
+                done, total, bytes_written, now = job.pop('progress')
+                if job['options'].get('mode') == 'atlas':
+                    # 图集导出按 打包/合成/编码 阶段报告，阶段耗时差别很大，不估算剩余时间
+                    text = (f"正在{ATLAS_EXPORT_PHASES[done]}图集 ({done}/{total})" if done < total
+                            else f"图集已写出, {bytes_written / 1024:.0f} KB")
+                else:
+                    elapsed = now - job['started']
+                    eta = elapsed / done * (total - done) if done else 0
+                    text = f"{done}/{total} 个文件, {bytes_written / 1024:.0f} KB, 剩余约 {eta:.0f} 秒"
+                job['status_label'].config(text=text, fg='gray')
+        
+        self.update_export_status()
+        self.export_polling = any(job['status'] in ('queued', 'running') for job in self.export_jobs)
+        if self.export_polling:
+            self.root.after(100, self.poll_export_events)
+    
+    def add_export_job_row(self, job):
+        # 只保留最近的几条已结束任务
+        finished = [j for j in self.export_jobs if j['status'] in ('done', 'error')]
+        for old in finished[:max(0, len(self.export_jobs) - 5)]:
+            old['row'].destroy()
+            self.export_jobs.remove(old)
+        
+        row = tk.Frame(self.export_jobs_frame, relief=tk.GROOVE, bd=1)
+        row.pack(fill=tk.X, pady=1)
+        tk.Label(row, text=f"{job['title']} ({len(job['sprites'])} 个精灵)",
+                 font=("Arial", 9, "bold")).pack(anchor=tk.W)
+        job['status_label'] = tk.Label(row, text="排队中", fg='gray', font=("Arial", 9),
+                                       wraplength=260, justify=tk.LEFT)
+        job['status_label'].pack(side=tk.LEFT, anchor=tk.W)
+        job['detail_button'] = ttk.Button(row, text="详情", state=tk.DISABLED,
+                                          command=lambda: self.show_export_summary(job))
+        job['detail_button'].pack(side=tk.RIGHT)
+        job['row'] = row
+    
+    def update_export_status(self):
+        running = sum(1 for job in self.export_jobs if job['status'] == 'running')
+        queued = sum(1 for job in self.export_jobs if job['status'] == 'queued')
+        if running or queued:
+            self.export_status_label.config(text=f"导出队列: {running} 个进行中, {queued} 个等待")
+        else:
+            self.export_status_label.config(text="")
+    
+    def show_export_summary(self, job):
+        metadata = job['metadata']
+        relative_path = job['relative_path']
+        if 'incremental' in metadata:
+            stats = metadata['incremental']
+            relative_path += (f"\n🔁 增量导出: 重新编码 {stats['written']} 个, "
+                              f"跳过 {stats['skipped']} 个, 删除 {stats['removed']} 个")
+        
+        if metadata['export_mode'] == 'individual':
+            messagebox.showinfo("导出成功", 
+                              f"✅ 成功导出 {metadata['sprite_count']} 个精灵\n\n"
+                              f"📁 保存位置: {relative_path}\n"
+                              f"📊 统计信息:\n"
+                              f"  • 图片数量: {metadata['statistics']['total_images']}\n"
+                              f"  • 尺寸范围: {metadata['statistics']['min_width']}~{metadata['statistics']['max_width']} × "
+                              f"{metadata['statistics']['min_height']}~{metadata['statistics']['max_height']}")
+        else:
+            atlas_size = metadata['atlas_size']
+            layout = metadata['layout_info']
+            packing = metadata['packing']
+            dedup = metadata['dedup']
+            messagebox.showinfo("导出成功", 
+                              f"✅ 成功导出图集\n\n"
+                              f"📁 保存位置: {relative_path}\n"
+                              f"📊 图集信息:\n"
+                              f"  • 图集尺寸: {atlas_size['width']}×{atlas_size['height']}\n"
+                              f"  • 精灵数量: {metadata['sprite_count']}\n"
+                              f"  • 估算布局: {layout['estimated_columns']}列 × {layout['estimated_rows']}行\n"
+                              f"  • 精灵间距: {metadata['sprite_padding']}像素\n"
+                              f"  • 打包算法: {packing['strategy']} (利用率 {packing['efficiency']:.1%})\n"
+                              f"  • 重复帧: {dedup['duplicate_count']}个 (去重率 {dedup['ratio']:.1%}，"
+                              f"实际打包 {dedup['unique_count']}帧)")
     
     def export_sprites(self):
         if not self.sprites:
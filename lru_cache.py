@@ -0,0 +1,72 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class LRUCache:
+    """按容量淘汰最久未使用项的缓存
+
+    capacity 为 sizeof 计量下的总容量，默认每项计为1（即按条目数限制）；
+    传入 sizeof 可改为按字节等计量。同时统计命中率。各操作加锁，可在多个线程间共享。
+    每次 clear() 使 generation 加1；put() 传入的 generation 早于当前值时丢弃写入，
+    这样清空前开始的后台计算完成后不会把过期结果写回缓存。
+    """
+
+    def __init__(self, capacity: int, sizeof: Optional[Callable[[Any], int]] = None):
+        self.capacity = capacity
+        self.sizeof = sizeof or (lambda value: 1)
+        self.items: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self.sizes = {}
+        self.total_size = 0
+        self.hits = 0
+        self.misses = 0
+        self.generation = 0
+        self.lock = threading.RLock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self.lock:
+            if key in self.items:
+                self.items.move_to_end(key)
+                self.hits += 1
+                return self.items[key]
+            self.misses += 1
+            return default
+
+    def put(self, key: Hashable, value: Any, generation: Optional[int] = None):
+        size = self.sizeof(value)
+        with self.lock:
+            if generation is not None and generation != self.generation:
+                return
+            if key in self.items:
+                self.pop(key)
+            self.items[key] = value
+            self.sizes[key] = size
+            self.total_size += size
+            # 至少保留刚放入的一项，哪怕它本身超过容量
+            while self.total_size > self.capacity and len(self.items) > 1:
+                self.pop(next(iter(self.items)))
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self.lock:
+            if key not in self.items:
+                return default
+            self.total_size -= self.sizes.pop(key)
+            return self.items.pop(key)
+
+    def clear(self):
+        with self.lock:
+            self.items.clear()
+            self.sizes.clear()
+            self.total_size = 0
+            self.generation += 1
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.items
+
+    def __len__(self) -> int:
+        return len(self.items)
@@ -0,0 +1,106 @@
+import numpy as np
+from typing import List, Optional, Sequence, Tuple
+
+
+class SpatialIndex:
+    """矩形的均匀网格索引，用于点击命中和框选
+
+    每个矩形登记到它覆盖的所有网格单元中，按单元排序后以 CSR 形式保存
+    （cell_starts[c]:cell_starts[c+1] 为单元 c 中的矩形下标），查询只检查相关单元。
+    矩形视为闭区间 [x, x + width] x [y, y + height]，与原先逐个比较的命中规则一致。
+    """
+
+    def __init__(self, rects: Sequence[Tuple[int, int, int, int]], cell_size: Optional[int] = None):
+        rects = np.asarray(rects, dtype=np.int64).reshape(-1, 4)
+        self.count = len(rects)
+        self.x1 = rects[:, 0]
+        self.y1 = rects[:, 1]
+        self.x2 = rects[:, 0] + rects[:, 2]
+        self.y2 = rects[:, 1] + rects[:, 3]
+
+        if cell_size is None:
+            # 单元边长取矩形尺寸的中位数，多数矩形只落在1～4个单元里
+            cell_size = int(np.median(np.maximum(rects[:, 2], rects[:, 3]))) if self.count else 1
+        self.cell_size = max(1, cell_size)
+
+        if self.count:
+            self.origin_x = int(self.x1.min())
+            self.origin_y = int(self.y1.min())
+            self.cols = int((self.x2.max() - self.origin_x) // self.cell_size) + 1
+            self.rows = int((self.y2.max() - self.origin_y) // self.cell_size) + 1
+        else:
+            self.origin_x = self.origin_y = 0
+            self.cols = self.rows = 0
+        self._build()
+
+    def _build(self):
+        cx1, cy1 = self._cell(self.x1, self.y1)
+        cx2, cy2 = self._cell(self.x2, self.y2)
+        spans_x = cx2 - cx1 + 1
+        spans_y = cy2 - cy1 + 1
+        per_rect = spans_x * spans_y
+
+        # 展开成 (单元, 矩形下标) 对：对每个矩形枚举其覆盖单元的局部偏移
+        owner = np.repeat(np.arange(self.count), per_rect)
+        offset = np.arange(per_rect.sum()) - np.repeat(np.cumsum(per_rect) - per_rect, per_rect)
+        cell_x = cx1[owner] + offset % spans_x[owner]
+        cell_y = cy1[owner] + offset // spans_x[owner]
+        cells = cell_y * self.cols + cell_x
+
+        order = np.argsort(cells, kind='stable')
+        self.entries = owner[order]
+        self.cell_starts = np.zeros(self.rows * self.cols + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cells, minlength=self.rows * self.cols), out=self.cell_starts[1:])
+
+    def _cell(self, x, y):
+        col = np.clip((x - self.origin_x) // self.cell_size, 0, max(self.cols - 1, 0))
+        row = np.clip((y - self.origin_y) // self.cell_size, 0, max(self.rows - 1, 0))
+        return col, row
+
+    def query_point(self, x: float, y: float) -> Optional[int]:
+        """返回包含该点的矩形中下标最小的一个，没有则返回 None"""
+        if not self.count:
+            return None
+        if not (self.origin_x <= x <= self.origin_x + self.cols * self.cell_size and
+                self.origin_y <= y <= self.origin_y + self.rows * self.cell_size):
+            return None
+
+        col, row = self._cell(int(x), int(y))
+        cell = row * self.cols + col
+        candidates = self.entries[self.cell_starts[cell]:self.cell_starts[cell + 1]]
+        hit = candidates[(self.x1[candidates] <= x) & (x <= self.x2[candidates]) &
+                         (self.y1[candidates] <= y) & (y <= self.y2[candidates])]
+        return int(hit.min()) if len(hit) else None
+
+    def query_rect(self, x1: float, y1: float, x2: float, y2: float,
+                   contained: bool = False) -> np.ndarray:
+        """返回与矩形相交（contained=True 时为完全落在其中）的所有矩形下标，升序"""
+        if not self.count:
+            return np.empty(0, dtype=np.int64)
+        x1, x2 = min(x1, x2), max(x1, x2)
+        y1, y2 = min(y1, y2), max(y1, y2)
+
+        col1, row1 = self._cell(int(x1), int(y1))
+        col2, row2 = self._cell(int(x2), int(y2))
+        covered_cells = (col2 - col1 + 1) * (row2 - row1 + 1)
+
+        if covered_cells * 4 >= self.rows * self.cols:
+            # 框选范围覆盖大半张图时，直接向量化检查全部矩形更快
+            candidates = np.arange(self.count)
+        else:
+            rows = np.arange(row1, row2 + 1)
+            starts = self.cell_starts[rows * self.cols + col1]
+            ends = self.cell_starts[rows * self.cols + col2 + 1]
+            candidates = np.unique(np.concatenate([self.entries[s:e] for s, e in zip(starts, ends)]))
+
+        if contained:
+            mask = ((x1 <= self.x1[candidates]) & (self.x2[candidates] <= x2) &
+                    (y1 <= self.y1[candidates]) & (self.y2[candidates] <= y2))
+        else:
+            mask = ((self.x1[candidates] <= x2) & (x1 <= self.x2[candidates]) &
+                    (self.y1[candidates] <= y2) & (y1 <= self.y2[candidates]))
+        return candidates[mask]
+
+
+def build_sprite_index(sprites: List) -> SpatialIndex:
+    return SpatialIndex([(s.x, s.y, s.width, s.height) for s in sprites])
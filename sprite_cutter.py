@@ -3,8 +3,16 @@ import numpy as np
 import cv2
 import json
 import os
-from typing import List, Tuple, Dict, Optional
-from dataclasses import dataclass
+import hashlib
+import functools
+import inspect
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Tuple, Dict, Optional, Callable
+from dataclasses import dataclass, field
+from atlas_packer import PackResult, pack_rects
+import tracing
+from spatial_index import SpatialIndex, build_sprite_index
+from lru_cache import LRUCache
 
 
 @dataclass
@@ -14,8 +22,253 @@ class SpriteInfo:
     y: int
     width: int
     height: int
-    image: Optional[Image.Image] = None
+    # 指向精灵表RGBA数组的视图，不持有像素副本
+    pixels: Optional[np.ndarray] = field(default=None, repr=False, compare=False)
     selected: bool = False
+    
+    @property
+    def image(self) -> Optional[Image.Image]:
+        """按需生成精灵图像，仅在此时复制像素"""
+        if self.pixels is None:
+            return None
+        return Image.fromarray(np.ascontiguousarray(self.pixels))
+
+
+# 帧变换 (rotated, flipX, flipY)：先逆时针旋转90°，再水平翻转、垂直翻转
+FRAME_TRANSFORMS = [
+    (rotated, flip_x, flip_y)
+    for rotated in (False, True)
+    for flip_x in (False, True)
+    for flip_y in (False, True)
+]
+
+
+def apply_frame_transform(pixels: np.ndarray, rotated: bool = False,
+                          flip_x: bool = False, flip_y: bool = False) -> np.ndarray:
+    """把图集中存储的帧像素变换为实际显示的像素"""
+    if rotated:
+        pixels = np.rot90(pixels)
+    if flip_x:
+        pixels = pixels[:, ::-1]
+    if flip_y:
+        pixels = pixels[::-1]
+    return pixels
+
+
+def _pixel_digest(pixels: np.ndarray) -> Tuple[Tuple[int, ...], bytes]:
+    pixels = np.ascontiguousarray(pixels)
+    return pixels.shape, hashlib.blake2b(pixels.tobytes(), digest_size=16).digest()
+
+
+ProgressCallback = Callable[[int, int, int], None]
+# 图集导出只写一个文件，按阶段报告进度：progress_callback(已完成阶段数, 阶段总数, 已写字节数)
+ATLAS_EXPORT_PHASES = ('打包', '合成', '编码')
+# 切割进度回调 (已处理数, 总数)，回调中抛出 CutCancelled 可中止切割；
+# 总数尚未确定的阶段（哈希、连通域分析、包围盒合并）之间以 (0, 0) 调用，只作为取消检查点
+CutProgressCallback = Callable[[int, int], None]
+
+# 切割时每处理这么多个精灵报告一次进度
+CUT_PROGRESS_INTERVAL = 1024
+# 计算内容哈希时每处理这么多字节检查一次取消
+HASH_CHUNK_BYTES = 16 * 1024 * 1024
+
+
+class CutCancelled(Exception):
+    """切割被进度回调中止"""
+
+
+# 切割结果缓存的默认内存上限（字节）
+CUT_CACHE_BYTES = 256 * 1024 * 1024
+# 每个 SpriteInfo 及其像素视图对象的大致开销
+SPRITE_OVERHEAD_BYTES = 512
+
+
+def _cut_result_size(sprites: List['SpriteInfo']) -> int:
+    """估算缓存一次切割结果占用的内存
+
+    视图会让整块底层数组（通常是整张精灵表）一直留在内存中，因此按底层数组计，
+    同一结果中共享同一底层数组的精灵只计一次。
+    """
+    buffers = {}
+    for sprite in sprites:
+        if sprite.pixels is None:
+            continue
+        root = sprite.pixels
+        while isinstance(root.base, np.ndarray):
+            root = root.base
+        buffers[id(root)] = root.nbytes
+    return sum(buffers.values()) + SPRITE_OVERHEAD_BYTES * len(sprites)
+
+
+def _freeze(value):
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _memoized_cut(method):
+    """按 (精灵表内容哈希, 切割方法, 参数) 缓存切割结果，progress_callback 不参与键"""
+    signature = inspect.signature(method)
+    
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        arguments = dict(bound.arguments)
+        del arguments['self']
+        progress_callback = arguments.pop('progress_callback', None)
+        
+        if self.image is None:
+            return method(self, *args, **kwargs)
+        
+        key = (self.get_content_hash(progress_callback), method.__name__, _freeze(tuple(arguments.items())))
+        sprites = self.cut_cache.get(key)
+        if sprites is None:
+            sprites = method(self, *args, **kwargs)
+            # 切割期间已载入新图时 cut_generation 已过期，结果不再写入缓存，避免继续引用旧图
+            self.cut_cache.put(key, sprites, self.cut_generation)
+        elif not self.keep_cached_selection:
+            for sprite in sprites:
+                sprite.selected = False
+        self.sprites = sprites
+        return sprites
+    return wrapper
+
+
+@dataclass
+class GridLayout:
+    """网格切割的几何布局，不裁切像素
+
+    单元格为 xs x ys 的笛卡尔积，occupied[row, col] 表示该单元格内是否有不透明像素。
+    """
+    xs: np.ndarray
+    ys: np.ndarray
+    cell_width: int
+    cell_height: int
+    occupied: np.ndarray
+    
+    @property
+    def cell_count(self) -> int:
+        return len(self.xs) * len(self.ys)
+    
+    @property
+    def occupied_count(self) -> int:
+        return int(self.occupied.sum())
+
+EXPORT_MANIFEST = 'export_manifest.json'
+
+
+@tracing.traced()
+def _save_pixels(pixels: np.ndarray, path: str, format: str, compress_level: int = 6) -> int:
+    """编码并保存一张图片，返回文件字节数"""
+    image = Image.fromarray(np.ascontiguousarray(pixels))
+    image_format = format.upper()
+    params = {}
+    if image_format == 'PNG':
+        params['compress_level'] = compress_level
+    elif image_format in ('JPG', 'JPEG'):
+        # JPEG 不支持透明通道
+        image_format = 'JPEG'
+        image = image.convert('RGB')
+    
+    image.save(path, image_format, **params)
+    return os.path.getsize(path)
+
+
+def _unique_file_names(names: List[str], format: str) -> List[str]:
+    """按精灵名称生成文件名，重名的依次加 _1、_2 … 后缀
+
+    比较时不区分大小写，大小写不敏感的文件系统上也不会有两张图写到同一个文件。
+    """
+    used = set()
+    file_names = []
+    for name in names:
+        file_name = f"{name}.{format}"
+        suffix = 1
+        while file_name.lower() in used:
+            file_name = f"{name}_{suffix}.{format}"
+            suffix += 1
+        used.add(file_name.lower())
+        file_names.append(file_name)
+    return file_names
+
+
+def _merge_boxes(boxes: np.ndarray, gap: int,
+                 progress_callback: Optional[CutProgressCallback] = None) -> np.ndarray:
+    """合并间距不超过gap的包围盒 (x1, y1, x2, y2)，直到没有可合并的盒子
+    
+    盒子（向外扩展gap后）登记到均匀网格的格子中，只比较落在同一格子里的盒子对。
+    每轮合并和每次标签传播前调用 progress_callback(0, 0)，供调用方取消。
+    """
+    while len(boxes) > 1:
+        if progress_callback:
+            progress_callback(0, 0)
+        n = len(boxes)
+        sizes = np.maximum(boxes[:, 2] - boxes[:, 0], boxes[:, 3] - boxes[:, 1])
+        cell = max(int(np.median(sizes)) + gap, 8)
+        
+        cx1 = (boxes[:, 0] - gap) // cell
+        cy1 = (boxes[:, 1] - gap) // cell
+        span_x = (boxes[:, 2] + gap) // cell - cx1 + 1
+        span_y = (boxes[:, 3] + gap) // cell - cy1 + 1
+        
+        # 展开成 (格子, 盒子) 条目，按格子排序后同一格子的盒子相邻
+        counts = span_x * span_y
+        owner = np.repeat(np.arange(n), counts)
+        local = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        cell_x = cx1[owner] + local % span_x[owner]
+        cell_y = cy1[owner] + local // span_x[owner]
+        order = np.lexsort((owner, cell_x, cell_y))
+        owner, cell_x, cell_y = owner[order], cell_x[order], cell_y[order]
+        
+        pairs_a, pairs_b = [], []
+        offset = 1
+        while offset < len(owner):
+            same = (cell_x[offset:] == cell_x[:-offset]) & (cell_y[offset:] == cell_y[:-offset])
+            if not same.any():
+                break
+            pairs_a.append(owner[:-offset][same])
+            pairs_b.append(owner[offset:][same])
+            offset += 1
+        if not pairs_a:
+            break
+        
+        a = np.concatenate(pairs_a)
+        b = np.concatenate(pairs_b)
+        near = ((np.maximum(boxes[b, 0] - boxes[a, 2], boxes[a, 0] - boxes[b, 2]) <= gap) &
+                (np.maximum(boxes[b, 1] - boxes[a, 3], boxes[a, 1] - boxes[b, 3]) <= gap))
+        a, b = a[near], b[near]
+        if len(a) == 0:
+            break
+        
+        # 最小标签传播 + 指针跳跃求连通分组
+        labels = np.arange(n)
+        while True:
+            if progress_callback:
+                progress_callback(0, 0)
+            low = np.minimum(labels[a], labels[b])
+            new_labels = labels.copy()
+            np.minimum.at(new_labels, a, low)
+            np.minimum.at(new_labels, b, low)
+            new_labels = new_labels[new_labels]
+            if np.array_equal(new_labels, labels):
+                break
+            labels = new_labels
+        
+        groups, labels = np.unique(labels, return_inverse=True)
+        if len(groups) == n:
+            break
+        
+        merged = np.empty((len(groups), 4), dtype=boxes.dtype)
+        merged[:, :2] = np.iinfo(boxes.dtype).max
+        merged[:, 2:] = np.iinfo(boxes.dtype).min
+        np.minimum.at(merged[:, 0], labels, boxes[:, 0])
+        np.minimum.at(merged[:, 1], labels, boxes[:, 1])
+        np.maximum.at(merged[:, 2], labels, boxes[:, 2])
+        np.maximum.at(merged[:, 3], labels, boxes[:, 3])
+        boxes = merged
+    
+    return boxes
 
 
 class SpriteCutter:
@@ -23,90 +276,246 @@ class SpriteCutter:
         self.image_path = image_path
         self.image = None
         self.sprites = []
+        self.pixels = None
+        self.alpha = None
+        self.occupancy = None
+        self.occupancy_threshold = None
+        self.sprite_index = None
+        self._indexed_sprites = None
+        self.content_hash = None
+        # 切割结果缓存；命中时返回同一批 SpriteInfo，keep_cached_selection 决定是否保留其选中状态
+        self.cut_cache = LRUCache(CUT_CACHE_BYTES, _cut_result_size)
+        # 当前精灵表对应的缓存代数，load_image 清空缓存时更新
+        self.cut_generation = self.cut_cache.generation
+        self.keep_cached_selection = True
         
         if image_path:
             self.load_image(image_path)
     
+    @tracing.traced()
     def load_image(self, image_path: str):
         self.image_path = image_path
-        self.image = Image.open(image_path).convert('RGBA')
+        # 精灵表像素只保存一份：图像与所有精灵共享同一个RGBA数组
+        self.sprites = []
+        # 缓存的精灵像素是旧精灵表的视图，换图后全部丢弃以免继续占用旧图内存
+        self.cut_cache.clear()
+        self.cut_generation = self.cut_cache.generation
+        self.content_hash = None
+        self.pixels = np.array(Image.open(image_path).convert('RGBA'))
+        # 载入后像素只读，后台切割可以安全地共享同一份数据
+        self.pixels.flags.writeable = False
+        self.image = Image.fromarray(self.pixels)
         self.width, self.height = self.image.size
+        
+        # 每张图只提取一次Alpha通道，并建立默认阈值下的占用积分图
+        self.alpha = self.pixels[:, :, 3]
+        self.occupancy = None
+        self.occupancy_threshold = None
+        self._build_occupancy(10)
         return self.image
     
-    def grid_cut_by_size(self, cell_width: int, cell_height: int, 
-                         padding_x: int = 0, padding_y: int = 0,
-                         offset_x: int = 0, offset_y: int = 0) -> List[SpriteInfo]:
+    def snapshot(self) -> 'SpriteCutter':
+        """返回共享同一份只读像素数据、但拥有独立精灵列表和缓存的切割器，供后台线程使用"""
+        cutter = SpriteCutter()
+        cutter.image_path = self.image_path
+        cutter.image = self.image
+        cutter.pixels = self.pixels
+        cutter.alpha = self.alpha
+        cutter.width, cutter.height = self.width, self.height
+        cutter.occupancy = self.occupancy
+        cutter.occupancy_threshold = self.occupancy_threshold
+        # 切割结果缓存与原切割器共享，后台切割的结果之后可以直接命中；
+        # 内容哈希可能尚未计算，留给后台线程在首次切割时计算，不阻塞调用方
+        cutter.content_hash = self.content_hash
+        cutter.cut_cache = self.cut_cache
+        cutter.cut_generation = self.cut_generation
+        cutter.keep_cached_selection = self.keep_cached_selection
+        return cutter
+    
+    def get_content_hash(self, progress_callback: Optional[CutProgressCallback] = None) -> Optional[str]:
+        """精灵表像素内容的哈希，首次使用时计算；按行块计算，块之间调用 progress_callback(0, 0)"""
+        if self.content_hash is None and self.pixels is not None:
+            digest = hashlib.blake2b(digest_size=16)
+            block_rows = max(1, HASH_CHUNK_BYTES // max(1, self.pixels[:1].nbytes))
+            for top in range(0, self.pixels.shape[0], block_rows):
+                if progress_callback:
+                    progress_callback(0, 0)
+                digest.update(self.pixels[top:top + block_rows].data)
+            digest.update(repr(self.pixels.shape).encode())
+            self.content_hash = digest.hexdigest()
+        return self.content_hash
+    
+    @tracing.traced()
+    def _build_occupancy(self, threshold: int) -> np.ndarray:
+        """建立"Alpha > threshold"像素数的积分图（summed-area table），同阈值时复用缓存"""
+        if self.occupancy is not None and self.occupancy_threshold == threshold:
+            return self.occupancy
+        
+        table = np.zeros((self.height + 1, self.width + 1), dtype=np.int32)
+        # 按行块把布尔掩码直接累加进积分图，临时数组只有一个行块大小，
+        # 不再生成全尺寸的 int32 掩码（整表 cumsum 到非连续的 out 时 numpy 也会缓冲一份全尺寸副本）
+        block_rows = 256
+        for top in range(0, self.height, block_rows):
+            bottom = min(self.height, top + block_rows)
+            block = table[top + 1:bottom + 1, 1:]
+            np.cumsum(self.alpha[top:bottom] > threshold, axis=0, dtype=np.int32, out=block)
+            block += table[top, 1:]
+        np.cumsum(table[1:, 1:], axis=1, out=table[1:, 1:])
+        
+        self.occupancy = table
+        self.occupancy_threshold = threshold
+        return table
+    
+    def count_opaque(self, x: int, y: int, width: int, height: int,
+                     threshold: int = 10) -> int:
+        """O(1) 统计矩形内不透明像素数，超出图片的部分视为透明"""
         if not self.image:
             raise ValueError("No image loaded")
         
-        sprites = []
-        sprite_index = 0
+        table = self._build_occupancy(threshold)
+        x1 = max(0, min(x, self.width))
+        y1 = max(0, min(y, self.height))
+        x2 = max(0, min(x + width, self.width))
+        y2 = max(0, min(y + height, self.height))
+        
+        return int(table[y2, x2] - table[y1, x2] - table[y2, x1] + table[y1, x1])
+    
+    def is_empty_rect(self, x: int, y: int, width: int, height: int,
+                      threshold: int = 10) -> bool:
+        return self.count_opaque(x, y, width, height, threshold) == 0
+    
+    def _view(self, x: int, y: int, width: int, height: int) -> np.ndarray:
+        """返回矩形区域的像素视图；矩形超出图片时退化为补齐透明像素的副本"""
+        if x >= 0 and y >= 0 and x + width <= self.width and y + height <= self.height:
+            return self.pixels[y:y + height, x:x + width]
         
-        y = offset_y
-        while y + cell_height <= self.height:
-            x = offset_x
-            while x + cell_width <= self.width:
-                sprite_img = self.image.crop((x, y, x + cell_width, y + cell_height))
-                
-                if not self._is_empty_sprite(sprite_img):
-                    sprite_info = SpriteInfo(
-                        name=f"sprite_{sprite_index:03d}",
-                        x=x,
-                        y=y,
-                        width=cell_width,
-                        height=cell_height,
-                        image=sprite_img
-                    )
-                    sprites.append(sprite_info)
-                    sprite_index += 1
-                
-                x += cell_width + padding_x
-            y += cell_height + padding_y
+        region = np.zeros((height, width, 4), dtype=np.uint8)
+        x1, y1 = max(0, x), max(0, y)
+        x2, y2 = min(x + width, self.width), min(y + height, self.height)
+        if x1 < x2 and y1 < y2:
+            region[y1 - y:y2 - y, x1 - x:x2 - x] = self.pixels[y1:y2, x1:x2]
+        return region
+    
+    @tracing.traced()
+    @_memoized_cut
+    def grid_cut_by_size(self, cell_width: int, cell_height: int, 
+                         padding_x: int = 0, padding_y: int = 0,
+                         offset_x: int = 0, offset_y: int = 0,
+                         progress_callback: Optional[CutProgressCallback] = None) -> List[SpriteInfo]:
+        layout = self.grid_layout(cell_width, cell_height, padding_x, padding_y, offset_x, offset_y)
+        xs, ys = layout.xs, layout.ys
         
+        rows, cols = np.nonzero(layout.occupied)
+        sprites = []
+        for sprite_index, (row, col) in enumerate(zip(rows, cols)):
+            if progress_callback and sprite_index % CUT_PROGRESS_INTERVAL == 0:
+                progress_callback(sprite_index, len(rows))
+            x = int(xs[col])
+            y = int(ys[row])
+            sprite_info = SpriteInfo(
+                name=f"sprite_{sprite_index:03d}",
+                x=x,
+                y=y,
+                width=cell_width,
+                height=cell_height,
+                pixels=self._view(x, y, cell_width, cell_height)
+            )
+            sprites.append(sprite_info)
+        
+        if progress_callback:
+            progress_callback(len(rows), len(rows))
+        tracing.count('sprites_cropped', len(sprites))
         self.sprites = sprites
         return sprites
     
-    def grid_cut_by_count(self, rows: int, cols: int, 
-                         padding_x: int = 0, padding_y: int = 0) -> List[SpriteInfo]:
+    def grid_layout(self, cell_width: int, cell_height: int,
+                    padding_x: int = 0, padding_y: int = 0,
+                    offset_x: int = 0, offset_y: int = 0) -> GridLayout:
+        """只计算网格单元格位置和是否为空，供实时预览和 grid_cut_by_size 使用"""
+        if not self.image:
+            raise ValueError("No image loaded")
+        if cell_width <= 0 or cell_height <= 0:
+            raise ValueError("Cell size must be positive")
+        
+        xs = np.arange(offset_x, self.width - cell_width + 1, cell_width + padding_x)
+        ys = np.arange(offset_y, self.height - cell_height + 1, cell_height + padding_y)
+        
+        # 用积分图一次性算出所有单元格的不透明像素数
+        table = self._build_occupancy(10)
+        x1 = np.clip(xs, 0, self.width)
+        x2 = np.clip(xs + cell_width, 0, self.width)
+        y1 = np.clip(ys, 0, self.height)[:, None]
+        y2 = np.clip(ys + cell_height, 0, self.height)[:, None]
+        counts = table[y2, x2] - table[y1, x2] - table[y2, x1] + table[y1, x1]
+        
+        return GridLayout(xs, ys, cell_width, cell_height, counts > 0)
+    
+    def grid_cell_size(self, rows: int, cols: int,
+                       padding_x: int = 0, padding_y: int = 0) -> Tuple[int, int]:
+        """按行列数计算网格单元格尺寸"""
         if not self.image:
             raise ValueError("No image loaded")
+        if rows <= 0 or cols <= 0:
+            raise ValueError("Rows and columns must be positive")
         
         available_width = self.width - padding_x * (cols - 1)
         available_height = self.height - padding_y * (rows - 1)
+        return available_width // cols, available_height // rows
+    
+    @tracing.traced()
+    @_memoized_cut
+    def grid_cut_by_count(self, rows: int, cols: int, 
+                         padding_x: int = 0, padding_y: int = 0,
+                         progress_callback: Optional[CutProgressCallback] = None) -> List[SpriteInfo]:
+        cell_width, cell_height = self.grid_cell_size(rows, cols, padding_x, padding_y)
         
-        cell_width = available_width // cols
-        cell_height = available_height // rows
-        
-        return self.grid_cut_by_size(cell_width, cell_height, padding_x, padding_y)
+        return self.grid_cut_by_size(cell_width, cell_height, padding_x, padding_y,
+                                     progress_callback=progress_callback)
     
+    @tracing.traced()
+    @_memoized_cut
     def auto_cut(self, min_sprite_size: int = 8, 
-                 threshold: int = 10) -> List[SpriteInfo]:
+                 threshold: int = 10, engine: str = 'contours',
+                 merge_gap: int = 0,
+                 progress_callback: Optional[CutProgressCallback] = None) -> List[SpriteInfo]:
         if not self.image:
             raise ValueError("No image loaded")
         
-        img_array = np.array(self.image)
-        alpha_channel = img_array[:, :, 3]
+        if engine not in ('contours', 'components'):
+            raise ValueError(f"Unknown auto cut engine: {engine}")
         
-        binary = (alpha_channel > threshold).astype(np.uint8) * 255
+        # OpenCV 调用期间无法中断，只能在各阶段之间检查取消
+        if progress_callback:
+            progress_callback(0, 0)
+        binary = (self.alpha > threshold).astype(np.uint8) * 255
         
-        contours, _ = cv2.findContours(binary, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        if engine == 'contours':
+            contours, _ = cv2.findContours(binary, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            if progress_callback:
+                progress_callback(0, 0)
+            rects = [cv2.boundingRect(contour) for contour in contours]
+        else:
+            # 连通域 + 邻近合并：把分离的粒子、武器、阴影并回所属精灵
+            _, _, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+            boxes = stats[1:, :4].astype(np.int64)
+            boxes[:, 2:] += boxes[:, :2]
+            boxes = _merge_boxes(boxes, merge_gap, progress_callback)
+            rects = [(x1, y1, x2 - x1, y2 - y1) for x1, y1, x2, y2 in boxes.tolist()]
         
         sprites = []
         sprite_index = 0
         
-        for contour in contours:
-            x, y, w, h = cv2.boundingRect(contour)
-            
+        for i, (x, y, w, h) in enumerate(rects):
+            if progress_callback and i % CUT_PROGRESS_INTERVAL == 0:
+                progress_callback(i, len(rects))
             if w >= min_sprite_size and h >= min_sprite_size:
-                sprite_img = self.image.crop((x, y, x + w, y + h))
-                
                 sprite_info = SpriteInfo(
                     name=f"sprite_{sprite_index:03d}",
                     x=x,
                     y=y,
                     width=w,
                     height=h,
-                    image=sprite_img
+                    pixels=self._view(x, y, w, h)
                 )
                 sprites.append(sprite_info)
                 sprite_index += 1
@@ -116,25 +525,35 @@ class SpriteCutter:
         for i, sprite in enumerate(sprites):
             sprite.name = f"sprite_{i:03d}"
         
+        if progress_callback:
+            progress_callback(len(rects), len(rects))
+        tracing.count('sprites_cropped', len(sprites))
         self.sprites = sprites
         return sprites
     
+    @tracing.traced()
+    @_memoized_cut
     def manual_cut(self, regions: List[Tuple[int, int, int, int]], 
-                   names: Optional[List[str]] = None) -> List[SpriteInfo]:
+                   names: Optional[List[str]] = None,
+                   progress_callback: Optional[CutProgressCallback] = None) -> List[SpriteInfo]:
         if not self.image:
             raise ValueError("No image loaded")
         
         sprites = []
         
         for i, (x, y, width, height) in enumerate(regions):
+            if progress_callback and i % CUT_PROGRESS_INTERVAL == 0:
+                progress_callback(i, len(regions))
             x = max(0, min(x, self.width))
             y = max(0, min(y, self.height))
             width = min(width, self.width - x)
             height = min(height, self.height - y)
             
-            sprite_img = self.image.crop((x, y, x + width, y + height))
+            # 跳过越界后为空或完全透明的选区
+            if width <= 0 or height <= 0 or self.is_empty_rect(x, y, width, height):
+                continue
             
-            name = names[i] if names and i < len(names) else f"sprite_{i:03d}"
+            name = names[i] if names and i < len(names) else f"sprite_{len(sprites):03d}"
             
             sprite_info = SpriteInfo(
                 name=name,
@@ -142,41 +561,113 @@ class SpriteCutter:
                 y=y,
                 width=width,
                 height=height,
-                image=sprite_img
+                pixels=self._view(x, y, width, height)
             )
             sprites.append(sprite_info)
         
+        if progress_callback:
+            progress_callback(len(regions), len(regions))
+        tracing.count('sprites_cropped', len(sprites))
         self.sprites = sprites
         return sprites
     
+    def get_sprite_index(self) -> SpatialIndex:
+        """当前切割结果的空间索引，只在精灵列表被替换后重建"""
+        if self._indexed_sprites is not self.sprites:
+            self.sprite_index = build_sprite_index(self.sprites)
+            self._indexed_sprites = self.sprites
+        return self.sprite_index
+    
+    @tracing.traced()
     def trim_sprites(self, sprites: Optional[List[SpriteInfo]] = None) -> List[SpriteInfo]:
         if sprites is None:
             sprites = self.sprites
         
+        sprites = [s for s in sprites if s.pixels is not None]
+        if not sprites:
+            return []
+        
         trimmed_sprites = []
         
-        for sprite in sprites:
-            if sprite.image:
-                trimmed_img, new_bounds = self._trim_transparent(sprite.image)
-                
-                if trimmed_img:
-                    new_sprite = SpriteInfo(
-                        name=sprite.name,
-                        x=sprite.x + new_bounds[0],
-                        y=sprite.y + new_bounds[1],
-                        width=new_bounds[2] - new_bounds[0],
-                        height=new_bounds[3] - new_bounds[1],
-                        image=trimmed_img
-                    )
-                    trimmed_sprites.append(new_sprite)
+        # 一次性求出所有边界，完全透明的精灵直接丢弃
+        for sprite, (x1, y1, x2, y2) in zip(sprites, self.trim_bounds(sprites).tolist()):
+            if x2 <= x1 or y2 <= y1:
+                continue
+            
+            new_sprite = SpriteInfo(
+                name=sprite.name,
+                x=x1,
+                y=y1,
+                width=x2 - x1,
+                height=y2 - y1,
+                pixels=self._view(x1, y1, x2 - x1, y2 - y1)
+            )
+            trimmed_sprites.append(new_sprite)
         
+        tracing.count('sprites_trimmed', len(trimmed_sprites))
         return trimmed_sprites
     
+    def trim_bounds(self, sprites: List[SpriteInfo], threshold: int = 10) -> np.ndarray:
+        """批量求精灵去除透明边缘后的边界，返回 (N, 4) 的 (x1, y1, x2, y2)；全透明精灵宽高为0
+        
+        所有精灵同时在积分图上二分查找四条边，每一步都是O(1)的矩形计数。
+        """
+        if not self.image:
+            raise ValueError("No image loaded")
+        
+        table = self._build_occupancy(threshold)
+        rects = np.array([(s.x, s.y, s.x + s.width, s.y + s.height) for s in sprites],
+                         dtype=np.int64).reshape(-1, 4)
+        x1 = np.clip(rects[:, 0], 0, self.width)
+        y1 = np.clip(rects[:, 1], 0, self.height)
+        x2 = np.clip(rects[:, 2], 0, self.width)
+        y2 = np.clip(rects[:, 3], 0, self.height)
+        
+        def count(ax1, ay1, ax2, ay2):
+            return table[ay2, ax2] - table[ay1, ax2] - table[ay2, ax1] + table[ay1, ax1]
+        
+        def search(lo, hi, covered):
+            # 对每个精灵在 [lo, hi] 内找使 covered 成立的最小值（covered 单调）
+            while np.any(lo < hi):
+                mid = (lo + hi) // 2
+                ok = covered(mid)
+                hi = np.where(ok, mid, hi)
+                lo = np.where(ok, lo, mid + 1)
+            return lo
+        
+        bounds = np.zeros((len(rects), 4), dtype=np.int64)
+        nonempty = count(x1, y1, x2, y2) > 0
+        x1, y1, x2, y2 = x1[nonempty], y1[nonempty], x2[nonempty], y2[nonempty]
+        
+        top = search(y1, y2 - 1, lambda t: count(x1, y1, x2, t + 1) > 0)
+        bottom = search(y1 + 1, y2, lambda t: count(x1, t, x2, y2) == 0)
+        left = search(x1, x2 - 1, lambda t: count(x1, top, t + 1, bottom) > 0)
+        right = search(x1 + 1, x2, lambda t: count(t, top, x2, bottom) == 0)
+        
+        bounds[nonempty] = np.stack([left, top, right, bottom], axis=1)
+        return bounds
+    
+    @tracing.traced()
     def export_selected_sprites(self, output_dir: str, format: str = 'png', 
                                 trim: bool = False, mode: str = 'individual',
                                 atlas_padding: int = 2, atlas_name: str = 'atlas',
-                                name_prefix: str = 'sprite_') -> Dict[str, any]:
-        selected_sprites = [s for s in self.sprites if s.selected]
+                                name_prefix: str = 'sprite_', pack_strategy: str = 'skyline',
+                                max_atlas_width: int = 2048, max_atlas_height: int = 0,
+                                power_of_two: bool = False, square: bool = False,
+                                dedupe: str = 'none', workers: Optional[int] = None,
+                                compress_level: int = 6, incremental: bool = False,
+                                progress_callback: Optional[ProgressCallback] = None,
+                                sprites: Optional[List[SpriteInfo]] = None) -> Dict[str, any]:
+        """导出选中的精灵
+        
+        incremental 为 True 时 output_dir 应是固定目录：按清单中记录的内容哈希和编码设置
+        跳过未变化的图片，并删除上次导出但本次不再产生的文件。
+        sprites 不为 None 时直接导出这份精灵列表（例如提交任务时拍下的选择快照），不再读取选中状态。
+        """
+        if sprites is None:
+            selected_sprites = [s for s in self.sprites if s.selected]
+        else:
+            selected_sprites = list(sprites)
         if not selected_sprites:
             raise ValueError("No sprites selected for export")
         
@@ -185,16 +676,27 @@ class SpriteCutter:
         sprites_to_export = self.trim_sprites(selected_sprites) if trim else selected_sprites
         
         if mode == 'individual':
-            return self._export_individual_sprites(sprites_to_export, output_dir, format, name_prefix)
+            return self._export_individual_sprites(sprites_to_export, output_dir, format, name_prefix,
+                                                   workers, compress_level, progress_callback,
+                                                   incremental)
         elif mode == 'atlas':
-            return self._export_atlas(sprites_to_export, output_dir, format, atlas_padding, atlas_name)
+            return self._export_atlas(sprites_to_export, output_dir, format, atlas_padding, atlas_name,
+                                      pack_strategy, max_atlas_width, max_atlas_height,
+                                      power_of_two, square, dedupe, compress_level,
+                                      progress_callback, incremental)
         else:
             raise ValueError(f"Unknown export mode: {mode}")
     
+    @tracing.traced()
     def _export_individual_sprites(self, sprites: List[SpriteInfo], output_dir: str, 
-                                  format: str, name_prefix: str = 'sprite_') -> Dict[str, any]:
+                                  format: str, name_prefix: str = 'sprite_',
+                                  workers: Optional[int] = None, compress_level: int = 6,
+                                  progress_callback: Optional[ProgressCallback] = None,
+                                  incremental: bool = False) -> Dict[str, any]:
+        sprites = [s for s in sprites if s.pixels is not None]
+        
         # 收集尺寸信息
-        sizes = [(s.width, s.height) for s in sprites if s.image]
+        sizes = [(s.width, s.height) for s in sprites]
         
         metadata = {
             'export_mode': 'individual',
@@ -213,21 +715,24 @@ class SpriteCutter:
             'sprites': []
         }
         
-        for i, sprite in enumerate(sprites):
-            if sprite.image:
-                file_name = f"{name_prefix}{i:03d}.{format}"
-                file_path = os.path.join(output_dir, file_name)
-                sprite.image.save(file_path, format.upper())
-                
-                sprite_meta = {
-                    'index': i,
-                    'name': sprite.name,
-                    'file': file_name,
-                    'width': sprite.width,
-                    'height': sprite.height,
-                    'size': f"{sprite.width}x{sprite.height}"
-                }
-                metadata['sprites'].append(sprite_meta)
+        file_names = [f"{name_prefix}{i:03d}.{format}" for i in range(len(sprites))]
+        items = [(s.pixels, os.path.join(output_dir, n)) for s, n in zip(sprites, file_names)]
+        if incremental:
+            metadata['incremental'] = self._sync_images(items, output_dir, format, workers,
+                                                        compress_level, progress_callback)
+        else:
+            self._write_images(items, format, workers, compress_level, progress_callback)
+        
+        for i, (sprite, file_name) in enumerate(zip(sprites, file_names)):
+            sprite_meta = {
+                'index': i,
+                'name': sprite.name,
+                'file': file_name,
+                'width': sprite.width,
+                'height': sprite.height,
+                'size': f"{sprite.width}x{sprite.height}"
+            }
+            metadata['sprites'].append(sprite_meta)
         
         metadata_path = os.path.join(output_dir, 'metadata.json')
         with open(metadata_path, 'w', encoding='utf-8') as f:
@@ -235,15 +740,32 @@ class SpriteCutter:
         
         return metadata
     
+    @tracing.traced()
     def _export_atlas(self, sprites: List[SpriteInfo], output_dir: str, 
-                     format: str, padding: int, atlas_name: str = 'atlas') -> Dict[str, any]:
+                     format: str, padding: int, atlas_name: str = 'atlas',
+                     pack_strategy: str = 'skyline', max_width: int = 2048,
+                     max_height: int = 0, power_of_two: bool = False,
+                     square: bool = False, dedupe: str = 'none', compress_level: int = 6,
+                     progress_callback: Optional[ProgressCallback] = None,
+                     incremental: bool = False) -> Dict[str, any]:
+        sprites = [s for s in sprites if s.pixels is not None]
         if not sprites:
             raise ValueError("No sprites to pack")
         
-        positions = self._pack_sprites(sprites, padding)
+        # 重复帧只打包一次，owners[i] 为第i个精灵实际使用的唯一帧下标
+        owners, transforms = self._dedupe_sprites(sprites, dedupe)
+        unique = sorted(set(owners))
+        unique_sprites = [sprites[i] for i in unique]
+        
+        packing = self._pack_sprites(unique_sprites, padding, pack_strategy, max_width,
+                                     max_height, power_of_two, square)
+        positions = dict(zip(unique, packing.positions))
+        phase_count = len(ATLAS_EXPORT_PHASES)
+        if progress_callback:
+            progress_callback(1, phase_count, 0)
         
-        atlas_width = int(max(p['x'] + p['width'] for p in positions))
-        atlas_height = int(max(p['y'] + p['height'] for p in positions))
+        atlas_width = packing.width
+        atlas_height = packing.height
         
         # 计算行列数
         sprite_widths = [s.width for s in sprites]
@@ -255,7 +777,7 @@ class SpriteCutter:
         estimated_cols = atlas_width // (avg_width + padding) if avg_width > 0 else 1
         estimated_rows = atlas_height // (avg_height + padding) if avg_height > 0 else 1
         
-        atlas_image = Image.new('RGBA', (atlas_width, atlas_height), (0, 0, 0, 0))
+        atlas_pixels = np.zeros((atlas_height, atlas_width, 4), dtype=np.uint8)
         
         metadata = {
             'export_mode': 'atlas',
@@ -269,6 +791,18 @@ class SpriteCutter:
             },
             'sprite_count': len(sprites),
             'sprite_padding': padding,
+            'packing': {
+                'strategy': packing.strategy,
+                'power_of_two': power_of_two,
+                'square': square,
+                'efficiency': round(packing.efficiency, 4)
+            },
+            'dedup': {
+                'mode': dedupe,
+                'unique_count': len(unique),
+                'duplicate_count': len(sprites) - len(unique),
+                'ratio': round((len(sprites) - len(unique)) / len(sprites), 4)
+            },
             'layout_info': {
                 'estimated_columns': estimated_cols,
                 'estimated_rows': estimated_rows,
@@ -283,23 +817,46 @@ class SpriteCutter:
             'sprites': []
         }
         
-        for sprite, pos in zip(sprites, positions):
-            if sprite.image:
-                atlas_image.paste(sprite.image, (pos['x'], pos['y']))
-                
-                sprite_meta = {
-                    'name': sprite.name,
-                    'frame': {
-                        'x': int(pos['x']),
-                        'y': int(pos['y']),
-                        'width': int(pos['width']),
-                        'height': int(pos['height'])
-                    }
+        for i, (x, y) in positions.items():
+            sprite = sprites[i]
+            atlas_pixels[y:y + sprite.height, x:x + sprite.width] = sprite.pixels
+        if progress_callback:
+            progress_callback(2, phase_count, 0)
+        
+        aliases: Dict[int, List[str]] = {}
+        for i, owner in enumerate(owners):
+            if owner != i:
+                aliases.setdefault(owner, []).append(sprites[i].name)
+        
+        for i, (sprite, owner, transform) in enumerate(zip(sprites, owners, transforms)):
+            x, y = positions[owner]
+            sprite_meta = {
+                'name': sprite.name,
+                'frame': {
+                    'x': int(x),
+                    'y': int(y),
+                    'width': int(sprites[owner].width),
+                    'height': int(sprites[owner].height)
                 }
-                metadata['sprites'].append(sprite_meta)
+            }
+            if dedupe == 'transform':
+                sprite_meta['rotated'], sprite_meta['flipX'], sprite_meta['flipY'] = transform
+            if owner != i:
+                sprite_meta['duplicate_of'] = sprites[owner].name
+            elif i in aliases:
+                sprite_meta['aliases'] = aliases[i]
+            metadata['sprites'].append(sprite_meta)
         
         atlas_path = os.path.join(output_dir, f'{atlas_name}.{format}')
-        atlas_image.save(atlas_path, format.upper())
+        if incremental:
+            metadata['incremental'] = self._sync_images([(atlas_pixels, atlas_path)], output_dir, format,
+                                                        1, compress_level)
+            written = metadata['incremental']['bytes_written']
+        else:
+            written = self._write_images([(atlas_pixels, atlas_path)], format, 1, compress_level)
+        # 增量导出时图集未变化则不会编码，这里统一报告编码阶段完成
+        if progress_callback:
+            progress_callback(phase_count, phase_count, written)
         
         metadata_path = os.path.join(output_dir, 'metadata.json')
         with open(metadata_path, 'w', encoding='utf-8') as f:
@@ -307,44 +864,59 @@ class SpriteCutter:
         
         return metadata
     
-    def _pack_sprites(self, sprites: List[SpriteInfo], padding: int) -> List[Dict]:
-        sorted_sprites = sorted(sprites, key=lambda s: s.height * s.width, reverse=True)
+    @tracing.traced()
+    def _dedupe_sprites(self, sprites: List[SpriteInfo],
+                        mode: str = 'none') -> Tuple[List[int], List[Tuple[bool, bool, bool]]]:
+        """按像素内容查找重复帧
         
-        positions = []
-        current_x = 0
-        current_y = 0
-        row_height = 0
-        max_width = 2048
+        返回 (owners, transforms)：owners[i] 为第i个精灵实际使用的帧下标，
+        transforms[i] 为从该帧得到第i个精灵的 (rotated, flipX, flipY)。
+        """
+        identity = (False, False, False)
+        if mode == 'none':
+            return list(range(len(sprites))), [identity] * len(sprites)
+        if mode not in ('exact', 'transform'):
+            raise ValueError(f"Unknown dedupe mode: {mode}")
         
-        for sprite in sorted_sprites:
-            width = sprite.width + padding
-            height = sprite.height + padding
-            
-            if current_x + width > max_width:
-                current_x = 0
-                current_y += row_height
-                row_height = 0
-            
-            positions.append({
-                'x': current_x,
-                'y': current_y,
-                'width': sprite.width,
-                'height': sprite.height
-            })
-            
-            current_x += width
-            row_height = max(row_height, height)
+        transforms = FRAME_TRANSFORMS if mode == 'transform' else [identity]
         
-        return positions
+        first_seen: Dict[Tuple[Tuple[int, ...], bytes], int] = {}
+        variants = []
+        owners = []
+        sprite_transforms = []
+        for i, sprite in enumerate(sprites):
+            # 对所有变换取最小哈希作为规范哈希，互为镜像/旋转的帧落入同一组
+            digests = [_pixel_digest(apply_frame_transform(sprite.pixels, *t)) for t in transforms]
+            variants.append(digests)
+            owner = first_seen.setdefault(min(digests), i)
+            
+            # 找出把代表帧变换成当前帧的变换，完全相同时优先取无变换
+            transform = next(t for t, digest in zip(transforms, variants[owner])
+                             if digest == digests[0])
+            owners.append(owner)
+            sprite_transforms.append(transform)
+        return owners, sprite_transforms
+    
+    @tracing.traced()
+    def _pack_sprites(self, sprites: List[SpriteInfo], padding: int,
+                      strategy: str = 'skyline', max_width: int = 2048,
+                      max_height: int = 0, power_of_two: bool = False,
+                      square: bool = False) -> PackResult:
+        return pack_rects([(s.width, s.height) for s in sprites], strategy, padding,
+                          max_width, max_height, power_of_two, square)
     
+    @tracing.traced()
     def export_sprites(self, output_dir: str, format: str = 'png', 
-                       trim: bool = False) -> Dict[str, any]:
+                       trim: bool = False, workers: Optional[int] = None,
+                       compress_level: int = 6,
+                       progress_callback: Optional[ProgressCallback] = None) -> Dict[str, any]:
         if not self.sprites:
             raise ValueError("No sprites to export")
         
         os.makedirs(output_dir, exist_ok=True)
         
         sprites_to_export = self.trim_sprites() if trim else self.sprites
+        sprites_to_export = [s for s in sprites_to_export if s.pixels is not None]
         
         metadata = {
             'source_image': os.path.basename(self.image_path) if self.image_path else 'unknown',
@@ -353,23 +925,24 @@ class SpriteCutter:
             'sprites': []
         }
         
-        for sprite in sprites_to_export:
-            if sprite.image:
-                file_name = f"{sprite.name}.{format}"
-                file_path = os.path.join(output_dir, file_name)
-                sprite.image.save(file_path, format.upper())
-                
-                sprite_meta = {
-                    'name': sprite.name,
-                    'file': file_name,
-                    'frame': {
-                        'x': sprite.x,
-                        'y': sprite.y,
-                        'width': sprite.width,
-                        'height': sprite.height
-                    }
+        # 精灵可以手动重命名，重名时各自写到不同文件，避免线程池中两个任务同时写一个路径
+        file_names = _unique_file_names([s.name for s in sprites_to_export], format)
+        self._write_images([(s.pixels, os.path.join(output_dir, n))
+                            for s, n in zip(sprites_to_export, file_names)],
+                           format, workers, compress_level, progress_callback)
+        
+        for sprite, file_name in zip(sprites_to_export, file_names):
+            sprite_meta = {
+                'name': sprite.name,
+                'file': file_name,
+                'frame': {
+                    'x': sprite.x,
+                    'y': sprite.y,
+                    'width': sprite.width,
+                    'height': sprite.height
                 }
-                metadata['sprites'].append(sprite_meta)
+            }
+            metadata['sprites'].append(sprite_meta)
         
         metadata_path = os.path.join(output_dir, 'sprites.json')
         with open(metadata_path, 'w', encoding='utf-8') as f:
@@ -377,32 +950,82 @@ class SpriteCutter:
         
         return metadata
     
-    def _is_empty_sprite(self, image: Image.Image, threshold: int = 10) -> bool:
-        img_array = np.array(image)
-        if img_array.shape[2] == 4:
-            alpha_channel = img_array[:, :, 3]
-            return np.all(alpha_channel <= threshold)
-        return False
+    @tracing.traced()
+    def _write_images(self, items: List[Tuple[np.ndarray, str]], format: str,
+                      workers: Optional[int] = None, compress_level: int = 6,
+                      progress_callback: Optional[ProgressCallback] = None) -> int:
+        """用有界线程池并行编码并写出图片，返回写入的总字节数
+        
+        Pillow 在 zlib 压缩时释放GIL，多线程可以真正并行编码PNG。
+        progress_callback(已完成数, 总数, 已写字节数) 在调用线程中触发。
+        各项的路径必须互不相同，否则多个线程会同时写同一个文件。
+        """
+        paths = [os.path.normcase(os.path.abspath(path)) for _, path in items]
+        if len(set(paths)) != len(paths):
+            raise ValueError("Duplicate output paths in image write batch")
+        total = len(items)
+        written = 0
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_save_pixels, pixels, path, format, compress_level)
+                       for pixels, path in items]
+            for done, future in enumerate(as_completed(futures), 1):
+                size = future.result()
+                written += size
+                tracing.count('files_written')
+                tracing.count('bytes_encoded', size)
+                if progress_callback:
+                    progress_callback(done, total, written)
+        return written
     
-    def _trim_transparent(self, image: Image.Image, threshold: int = 10) -> Tuple[Optional[Image.Image], Optional[Tuple[int, int, int, int]]]:
-        img_array = np.array(image)
-        if img_array.shape[2] != 4:
-            return image, (0, 0, image.width, image.height)
+    @tracing.traced()
+    def _sync_images(self, items: List[Tuple[np.ndarray, str]], output_dir: str, format: str,
+                     workers: Optional[int] = None, compress_level: int = 6,
+                     progress_callback: Optional[ProgressCallback] = None) -> Dict[str, int]:
+        """增量写出图片：只编码内容或编码设置有变化的文件，删除清单中已过期的文件
         
-        alpha_channel = img_array[:, :, 3]
+        返回 {'written', 'skipped', 'removed', 'bytes_written'} 统计。
+        """
+        manifest_path = os.path.join(output_dir, EXPORT_MANIFEST)
+        settings = {'format': format.lower(), 'compress_level': compress_level}
+        previous = {}
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            # 编码设置变了，所有旧文件都需要重新编码
+            if manifest.get('settings') == settings:
+                previous = manifest.get('files', {})
+            stale = set(manifest.get('files', {}))
+        except (OSError, ValueError):
+            stale = set()
         
-        non_transparent = np.where(alpha_channel > threshold)
+        files = {}
+        changed = []
+        for pixels, path in items:
+            shape, digest = _pixel_digest(pixels)
+            file_name = os.path.basename(path)
+            files[file_name] = f"{'x'.join(map(str, shape))}:{digest.hex()}"
+            if previous.get(file_name) != files[file_name] or not os.path.exists(path):
+                changed.append((pixels, path))
         
-        if len(non_transparent[0]) == 0:
-            return None, None
+        removed = 0
+        for file_name in stale - set(files):
+            try:
+                os.remove(os.path.join(output_dir, file_name))
+                removed += 1
+            except FileNotFoundError:
+                pass
         
-        min_y, max_y = non_transparent[0].min(), non_transparent[0].max()
-        min_x, max_x = non_transparent[1].min(), non_transparent[1].max()
+        written = self._write_images(changed, format, workers, compress_level, progress_callback)
         
-        bounds = (min_x, min_y, max_x + 1, max_y + 1)
-        trimmed = image.crop(bounds)
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump({'settings': settings, 'files': files}, f, indent=2)
         
-        return trimmed, bounds
+        return {
+            'written': len(changed),
+            'skipped': len(items) - len(changed),
+            'removed': removed,
+            'bytes_written': written
+        }
     
     def get_sprite_preview(self, index: int) -> Optional[Image.Image]:
         if 0 <= index < len(self.sprites):
@@ -0,0 +1,159 @@
+import queue
+import threading
+import tkinter as tk
+import numpy as np
+from PIL import Image, ImageTk
+from typing import List, Optional
+
+from lru_cache import LRUCache
+
+
+class ThumbnailStrip(tk.Frame):
+    """可横向滚动浏览全部精灵的缩略图条
+
+    只为可见的格子创建画布对象；缩略图在后台线程生成，
+    PhotoImage 在主线程创建并按 (x, y, 宽, 高, 缩略图尺寸) 放入 LRU 缓存。
+    """
+
+    CELL_PADDING = 6
+    TEXT_HEIGHT = 28
+
+    def __init__(self, parent, thumb_size: int = 80, cache_size: int = 2000, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.thumb_size = thumb_size
+        self.cell_width = thumb_size + self.CELL_PADDING * 2
+        self.sprites = []
+        self.source = None
+        self.cache = LRUCache(cache_size)
+        self.cells = {}       # 可见格子下标 -> (图片对象, 文字对象)
+        self.wanted = set()   # 当前可见、仍需生成的缩略图键
+        self.requests = queue.Queue()
+        self.results = queue.Queue()
+        self.polling = False
+        self.render_pending = False
+
+        self.canvas = tk.Canvas(self, height=thumb_size + self.TEXT_HEIGHT + self.CELL_PADDING * 2,
+                                bg='white', highlightthickness=0)
+        scrollbar = tk.Scrollbar(self, orient=tk.HORIZONTAL, command=self.canvas.xview)
+
+        def on_scroll(*args):
+            scrollbar.set(*args)
+            self.schedule_render()
+
+        self.canvas.config(xscrollcommand=on_scroll)
+        self.canvas.pack(side=tk.TOP, fill=tk.X)
+        scrollbar.pack(side=tk.BOTTOM, fill=tk.X)
+        self.canvas.bind("<Configure>", lambda e: self.schedule_render())
+        self.canvas.bind("<MouseWheel>", self.on_mousewheel)
+        self.canvas.bind("<Shift-MouseWheel>", self.on_mousewheel)
+
+        worker = threading.Thread(target=self.run_worker, daemon=True)
+        worker.start()
+
+    def set_sprites(self, sprites: List, source: Optional[np.ndarray] = None):
+        """显示新的精灵列表，source 为精灵像素所属的精灵表数组，换图时清空缓存"""
+        if source is not self.source:
+            self.cache.clear()
+            self.source = source
+        self.sprites = sprites
+        self.wanted = set()
+        self.canvas.delete("all")
+        self.cells = {}
+        self.canvas.config(scrollregion=(0, 0, len(sprites) * self.cell_width, 1))
+        self.canvas.xview_moveto(0)
+        self.render_visible()
+
+    def clear(self):
+        self.set_sprites([], self.source)
+
+    def key_for(self, sprite):
+        return (sprite.x, sprite.y, sprite.width, sprite.height, self.thumb_size)
+
+    def on_mousewheel(self, event):
+        self.canvas.xview_scroll(-1 if event.delta > 0 else 1, "units")
+
+    def schedule_render(self):
+        if not self.render_pending:
+            self.render_pending = True
+            self.after_idle(self.render_visible)
+
+    def render_visible(self):
+        """只为可见范围内的格子创建画布对象，并为缺失的缩略图排队生成"""
+        self.render_pending = False
+        if not self.sprites:
+            return
+
+        left = self.canvas.canvasx(0)
+        right = self.canvas.canvasx(self.canvas.winfo_width())
+        first = max(0, int(left // self.cell_width))
+        last = min(len(self.sprites) - 1, int(right // self.cell_width))
+        visible = set(range(first, last + 1))
+
+        for index in list(self.cells):
+            if index not in visible:
+                for item in self.cells.pop(index):
+                    self.canvas.delete(item)
+
+        wanted = set()
+        for index in range(first, last + 1):
+            sprite = self.sprites[index]
+            key = self.key_for(sprite)
+            photo = self.cache.get(key)
+            if index not in self.cells:
+                x = index * self.cell_width + self.cell_width // 2
+                image_item = self.canvas.create_image(x, self.CELL_PADDING + self.thumb_size // 2,
+                                                      anchor=tk.CENTER)
+                text_item = self.canvas.create_text(
+                    x, self.CELL_PADDING + self.thumb_size + 2, anchor=tk.N, font=("Arial", 8),
+                    text=f"{sprite.name}\n{sprite.width}x{sprite.height}"
+                )
+                self.cells[index] = (image_item, text_item)
+            if photo is not None:
+                self.canvas.itemconfig(self.cells[index][0], image=photo)
+            elif sprite.pixels is not None and key not in wanted:
+                wanted.add(key)
+                if key not in self.wanted:
+                    self.requests.put((key, sprite.pixels))
+
+        # 滚出视野的请求在工作线程中直接跳过
+        self.wanted = wanted
+        if wanted and not self.polling:
+            self.polling = True
+            self.after(30, self.poll_results)
+
+    def run_worker(self):
+        while True:
+            key, pixels = self.requests.get()
+            if key not in self.wanted:
+                continue
+            self.results.put((key, make_thumbnail(pixels, self.thumb_size)))
+
+    def poll_results(self):
+        updated = False
+        while True:
+            try:
+                key, thumbnail = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if key in self.wanted:
+                self.cache.put(key, ImageTk.PhotoImage(thumbnail))
+                self.wanted.discard(key)
+                updated = True
+
+        if updated:
+            for index, (image_item, _) in self.cells.items():
+                photo = self.cache.get(self.key_for(self.sprites[index]))
+                if photo is not None:
+                    self.canvas.itemconfig(image_item, image=photo)
+
+        self.polling = bool(self.wanted)
+        if self.polling:
+            self.after(30, self.poll_results)
+
+
+def make_thumbnail(pixels: np.ndarray, size: int) -> Image.Image:
+    """生成缩略图：大精灵先按步长抽样到约两倍目标尺寸，避免复制和缩放整张精灵"""
+    step = max(1, max(pixels.shape[:2]) // (size * 2))
+    image = Image.fromarray(np.ascontiguousarray(pixels[::step, ::step]))
+    image.thumbnail((size, size), Image.Resampling.LANCZOS)
+    return image
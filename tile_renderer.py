@@ -0,0 +1,62 @@
+import math
+from PIL import Image
+from typing import List, Tuple
+
+
+TILE_SIZE = 256
+
+
+class TilePyramid:
+    """精灵表的多分辨率金字塔，按需生成固定大小的显示分块
+
+    第0层是原图，第k层由上一层 2x2 平均缩小得到，首次用到时才生成。
+    缩放比例 scale 下的第 (tx, ty) 块覆盖显示坐标
+    [tx * tile_size, (tx + 1) * tile_size) x [ty * tile_size, (ty + 1) * tile_size)，
+    从不小于目标分辨率的最小一层裁切并最近邻缩放得到，因此每块的开销与原图大小无关。
+    """
+
+    def __init__(self, image: Image.Image, tile_size: int = TILE_SIZE):
+        self.image = image
+        self.tile_size = tile_size
+        self.levels = [image]
+
+    def display_size(self, scale: float) -> Tuple[int, int]:
+        return max(1, int(self.image.width * scale)), max(1, int(self.image.height * scale))
+
+    def grid_size(self, scale: float) -> Tuple[int, int]:
+        width, height = self.display_size(scale)
+        return math.ceil(width / self.tile_size), math.ceil(height / self.tile_size)
+
+    def level_for(self, scale: float) -> Tuple[Image.Image, float]:
+        """返回 (层图像, 该层相对原图的比例)"""
+        level = 0
+        while 0.5 ** (level + 1) >= scale and min(self.levels[level].size) > 1:
+            level += 1
+            if level == len(self.levels):
+                self.levels.append(self.levels[-1].reduce(2))
+        return self.levels[level], 0.5 ** level
+
+    def visible_tiles(self, scale: float, x1: float, y1: float, x2: float, y2: float,
+                      margin: int = 0) -> List[Tuple[int, int]]:
+        """与显示坐标矩形相交的分块，margin 为额外预取的分块圈数"""
+        cols, rows = self.grid_size(scale)
+        tx1 = max(0, int(x1 // self.tile_size) - margin)
+        ty1 = max(0, int(y1 // self.tile_size) - margin)
+        tx2 = min(cols - 1, int(x2 // self.tile_size) + margin)
+        ty2 = min(rows - 1, int(y2 // self.tile_size) + margin)
+        return [(tx, ty) for ty in range(ty1, ty2 + 1) for tx in range(tx1, tx2 + 1)]
+
+    def tile(self, scale: float, tx: int, ty: int) -> Image.Image:
+        width, height = self.display_size(scale)
+        left = tx * self.tile_size
+        top = ty * self.tile_size
+        tile_width = min(self.tile_size, width - left)
+        tile_height = min(self.tile_size, height - top)
+
+        level, level_scale = self.level_for(scale)
+        # 显示坐标换算到所选层的坐标
+        ratio = level_scale / scale
+        box = (left * ratio, top * ratio,
+               min((left + tile_width) * ratio, level.width),
+               min((top + tile_height) * ratio, level.height))
+        return level.resize((tile_width, tile_height), Image.Resampling.NEAREST, box=box)
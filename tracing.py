@@ -0,0 +1,96 @@
+"""轻量级性能追踪：记录嵌套耗时区间和计数器，输出 Chrome trace-event JSON
+
+设置环境变量 SPRITE_TRACE 开启（值为输出文件路径，设为 1 时写入 sprite_trace.json），
+程序退出时写出，可在 chrome://tracing 或 https://ui.perfetto.dev 中打开。
+未开启时 traced 直接返回原函数，span / count 为空操作。
+"""
+
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, List, Optional
+
+
+_setting = os.environ.get('SPRITE_TRACE', '')
+ENABLED = _setting not in ('', '0')
+TRACE_PATH = 'sprite_trace.json' if _setting in ('1', 'true') else _setting
+
+_events: List[Dict] = []
+_counters: Dict[str, float] = {}
+_lock = threading.Lock()
+_pid = os.getpid()
+_null_span = nullcontext()
+
+
+def _now_us() -> float:
+    return time.perf_counter_ns() / 1000
+
+
+@contextmanager
+def _span(name: str, args: Dict):
+    start = _now_us()
+    try:
+        yield
+    finally:
+        event = {
+            'name': name, 'ph': 'X', 'ts': start, 'dur': _now_us() - start,
+            'pid': _pid, 'tid': threading.get_ident()
+        }
+        if args:
+            event['args'] = args
+        with _lock:
+            _events.append(event)
+
+
+def span(name: str, **args):
+    """记录一个耗时区间：with span('pack', count=n): ..."""
+    if not ENABLED:
+        return _null_span
+    return _span(name, args)
+
+
+def traced(name: Optional[str] = None) -> Callable:
+    """把整个函数记录为一个区间的装饰器，默认用函数限定名作为区间名"""
+    def decorator(func):
+        if not ENABLED:
+            return func
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _span(label, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count(name: str, value: float = 1):
+    """累加计数器，例如 count('bytes_encoded', n)"""
+    if not ENABLED:
+        return
+    with _lock:
+        total = _counters[name] = _counters.get(name, 0) + value
+        _events.append({
+            'name': name, 'ph': 'C', 'ts': _now_us(), 'pid': _pid,
+            'tid': threading.get_ident(), 'args': {name: total}
+        })
+
+
+def write_trace(path: Optional[str] = None) -> Optional[str]:
+    """写出已记录的事件，返回文件路径；未开启追踪时不写"""
+    if not ENABLED:
+        return None
+    path = path or TRACE_PATH
+    with _lock:
+        data = {'traceEvents': list(_events), 'otherData': {'counters': dict(_counters)}}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    return path
+
+
+if ENABLED:
+    atexit.register(write_trace)